@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, JSON, Text, Enum
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, JSON, Text, Enum, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
@@ -72,6 +72,16 @@ class Option(Base):
     # Relationships
     instrument = relationship("Instrument", back_populates="options")
     price_data = relationship("OptionPriceData", back_populates="option")
+    
+    # Covering index for the per-instrument 7 DTE chain lookups used in signal
+    # generation, so ATM strike searches are index-only scans
+    __table_args__ = (
+        Index(
+            "idx_options_instrument_type_exp",
+            "instrument_id", "option_type", "expiration_date",
+            postgresql_include=["strike_price", "id"]
+        ),
+    )
 
 class OptionPriceData(Base):
     __tablename__ = "option_price_data"
@@ -157,6 +167,15 @@ class StockPrice(Base):
     
     # Relationships
     instrument = relationship("Instrument")
+    
+    # Covering index for latest-close and price-window lookups per instrument
+    __table_args__ = (
+        Index(
+            "idx_stock_prices_instrument_timestamp_close",
+            "instrument_id", timestamp.desc(),
+            postgresql_include=["close"]
+        ),
+    )
 
 class VolatilityData(Base):
     __tablename__ = "volatility_data"
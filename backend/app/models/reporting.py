@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, JSON, Text, Enum, Table
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, JSON, Text, Enum, Table, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import enum
@@ -135,4 +135,10 @@ class FundamentalData(Base):
     
     # Relationships
     instrument = relationship("Instrument", back_populates="fundamental_data")
+    
+    # Indexes for the per-instrument daily lookups and earnings-window scans used in reporting
+    __table_args__ = (
+        Index("idx_fundamental_instrument_date", "instrument_id", "date"),
+        Index("idx_fundamental_next_earnings", "next_earnings_date"),
+    )
 
@@ -0,0 +1,151 @@
+"""
+Technical indicator kernels for the signal generation service.
+
+The kernels walk contiguous price arrays once and return only the
+trailing values the signal rules compare against, instead of building
+full indicator Series. Inputs may be float32 to halve memory traffic;
+running sums and recurrences are accumulated in float64.
+"""
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+# Minimum bars for every indicator to be warmed up: the 26-period slow EMA
+# plus one more bar for the crossover comparison
+MIN_TA_BARS = 27
+
+
+class TechnicalTail(NamedTuple):
+    """Latest indicator values needed by the technical signal rules."""
+    close: float
+    prev_close: float
+    rsi: float
+    macd: float
+    prev_macd: float
+    signal_line: float
+    prev_signal_line: float
+    histogram: float
+    sma: float
+    upper_band: float
+    lower_band: float
+    prev_upper_band: float
+    prev_lower_band: float
+    volume_ratio: float
+
+
+def bollinger_last(
+    close: np.ndarray,
+    window: int = 20,
+    num_std: float = 2.0
+) -> Tuple[float, float, float, float, float]:
+    """
+    Calculate Bollinger Bands for the last two bars.
+
+    Returns (sma, upper band, lower band, previous upper band, previous
+    lower band), using the sample standard deviation. Both windows are
+    derived from one moving sum over the last window + 1 bars, shifted by
+    the latest close to keep the sum of squares well conditioned.
+    """
+    span = close[-window - 1:].astype(np.float64)
+    shift = span[-1]
+    span -= shift
+    total = span.sum()
+    total_sq = (span * span).sum()
+
+    recent_sum = total - span[0]
+    recent_sq = total_sq - span[0] * span[0]
+    prev_sum = total - span[-1]
+    prev_sq = total_sq - span[-1] * span[-1]
+
+    recent_mean = recent_sum / window
+    prev_mean = prev_sum / window
+    std = np.sqrt(max(recent_sq - recent_sum * recent_mean, 0.0) / (window - 1))
+    prev_std = np.sqrt(max(prev_sq - prev_sum * prev_mean, 0.0) / (window - 1))
+
+    sma = recent_mean + shift
+    prev_sma = prev_mean + shift
+
+    return (
+        sma,
+        sma + num_std * std,
+        sma - num_std * std,
+        prev_sma + num_std * prev_std,
+        prev_sma - num_std * prev_std
+    )
+
+
+def compute_ta_tail(
+    close: np.ndarray,
+    volume: np.ndarray,
+    rsi_period: int = 14,
+    fast_period: int = 12,
+    slow_period: int = 26,
+    signal_period: int = 9,
+    bb_window: int = 20
+) -> TechnicalTail:
+    """
+    Calculate RSI, MACD and Bollinger Bands in a single pass over the closes.
+
+    RSI uses Wilder's smoothing seeded with the simple average of the first
+    rsi_period moves; the MACD EMAs match pandas ewm(adjust=False).
+    """
+    min_bars = max(slow_period, rsi_period, bb_window) + 1
+    if len(close) < min_bars:
+        raise ValueError(f"Need at least {min_bars} bars, got {len(close)}")
+
+    fast_alpha = 2.0 / (fast_period + 1)
+    slow_alpha = 2.0 / (slow_period + 1)
+    signal_alpha = 2.0 / (signal_period + 1)
+
+    # Split moves into gains and losses and seed Wilder's averages
+    deltas = np.diff(close)
+    gains = np.where(deltas > 0, deltas, 0.0)
+    losses = np.where(deltas < 0, -deltas, 0.0)
+    avg_gain = float(gains[:rsi_period].mean(dtype=np.float64))
+    avg_loss = float(losses[:rsi_period].mean(dtype=np.float64))
+
+    # Iterate over Python floats so the recurrences run in double precision
+    closes = close.tolist()
+    gains = gains.tolist()
+    losses = losses.tolist()
+
+    fast_ema = closes[0]
+    slow_ema = closes[0]
+    macd = 0.0
+    signal = 0.0
+    prev_macd = 0.0
+    prev_signal = 0.0
+
+    for i in range(1, len(closes)):
+        # RSI
+        if i > rsi_period:
+            avg_gain = (avg_gain * (rsi_period - 1) + gains[i - 1]) / rsi_period
+            avg_loss = (avg_loss * (rsi_period - 1) + losses[i - 1]) / rsi_period
+
+        # MACD
+        prev_macd = macd
+        prev_signal = signal
+        fast_ema += fast_alpha * (closes[i] - fast_ema)
+        slow_ema += slow_alpha * (closes[i] - slow_ema)
+        macd = fast_ema - slow_ema
+        signal += signal_alpha * (macd - signal)
+
+    rsi = 100.0 if avg_loss == 0 else 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    sma, upper_band, lower_band, prev_upper_band, prev_lower_band = bollinger_last(close, bb_window)
+
+    return TechnicalTail(
+        close=float(close[-1]),
+        prev_close=float(close[-2]),
+        rsi=float(rsi),
+        macd=float(macd),
+        prev_macd=float(prev_macd),
+        signal_line=float(signal),
+        prev_signal_line=float(prev_signal),
+        histogram=float(macd - signal),
+        sma=float(sma),
+        upper_band=float(upper_band),
+        lower_band=float(lower_band),
+        prev_upper_band=float(prev_upper_band),
+        prev_lower_band=float(prev_lower_band),
+        volume_ratio=float(volume[-1] / volume[-5:].mean(dtype=np.float64))
+    )
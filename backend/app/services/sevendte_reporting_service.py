@@ -1,10 +1,11 @@
 import logging
 import numpy as np
+import pandas as pd
 from datetime import datetime, timedelta
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, TypedDict
 
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, cast, Date
 
 from app.services.reporting_service import ReportingService
 from app.models.reporting import Report, ReportType, MarketCondition, SignalFactor, FundamentalData
@@ -17,6 +18,55 @@ from app.models.user import User
 
 logger = logging.getLogger(__name__)
 
+DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+DATE_FORMAT = "%Y-%m-%d"
+
+# Days to add to reach the next weekday, indexed by date.weekday() (Friday -> Monday is 3)
+_NEXT_BIZDAY_OFFSET = (1, 1, 1, 1, 3, 2, 1)
+
+# Keys of the positions_approaching_expiration entries, in query column order
+_POS_KEYS = ("id", "symbol", "direction", "entry_price", "days_to_expiration")
+
+
+class PositionSummary(TypedDict):
+    """Open position approaching expiration in the next-day outlook."""
+    id: int
+    symbol: str
+    direction: str
+    entry_price: float
+    days_to_expiration: int
+
+
+class UpcomingEarnings(TypedDict):
+    """Earnings announcement in the next-day outlook."""
+    symbol: str
+    date: Optional[str]
+    time: Optional[str]
+    estimated_eps: Optional[float]
+
+
+class NextDayOutlook(TypedDict):
+    """Next-day outlook section of the 7DTE daily report."""
+    next_trading_day: str
+    market_outlook: str
+    expected_volatility: str
+    upcoming_earnings: List[UpcomingEarnings]
+    positions_approaching_expiration: List[PositionSummary]
+
+
+def _format_datetimes(values: List[Optional[datetime]], fmt: str) -> List[Optional[str]]:
+    """Format a column of datetimes in a single vectorized pass, keeping None for missing values."""
+    if not values:
+        return []
+    formatted = pd.Series(pd.to_datetime(values)).dt.strftime(fmt)
+    return formatted.astype(object).where(formatted.notna(), None).tolist()
+
+
+def _to_records(df: pd.DataFrame) -> List[Dict[str, Any]]:
+    """Convert a DataFrame to a list of row dicts with native Python values and None for missing values."""
+    return df.astype(object).where(df.notna(), None).to_dict(orient="records")
+
+
 class SevenDTEReportingService(ReportingService):
     """Reporting service for 7DTE system."""
     
@@ -115,13 +165,15 @@ class SevenDTEReportingService(ReportingService):
             FundamentalData.next_earnings_date <= next_week
         ).all()
         
-        for data in fundamental_data_this_week:
+        earnings_dates = _format_datetimes([d.next_earnings_date for d in fundamental_data_this_week], DATE_FORMAT)
+        
+        for data, earnings_date in zip(fundamental_data_this_week, earnings_dates):
             instrument = self.db.query(Instrument).filter(Instrument.id == data.instrument_id).first()
             
             if instrument:
                 earnings_this_week.append({
                     "symbol": instrument.symbol,
-                    "date": data.next_earnings_date.strftime("%Y-%m-%d"),
+                    "date": earnings_date,
                     "time": data.earnings_time,
                     "estimated_eps": data.estimated_eps,
                     "previous_eps": data.previous_eps
@@ -198,22 +250,22 @@ class SevenDTEReportingService(ReportingService):
         for category, factors in factor_by_category.items():
             category_importance[category] = sum(f.factor_weight for f in factors) / len(factors) if factors else 0
         
+        # Group factors by signal
+        factors_by_signal = {}
+        for factor in signal_factors:
+            if factor.signal_id not in factors_by_signal:
+                factors_by_signal[factor.signal_id] = []
+            factors_by_signal[factor.signal_id].append(factor)
+        
+        # Get fundamental data for all signal symbols in one pass
+        fundamental_by_symbol = self._get_fundamental_data_by_symbol({s.symbol for s in signals}, date)
+        
         # Get detailed signal data
         signal_details = []
-        for signal in signals:
-            # Get factors for this signal
-            factors = [f for f in signal_factors if f.signal_id == signal.id]
-            
-            # Get instrument
-            instrument = self.db.query(Instrument).filter(Instrument.symbol == signal.symbol).first()
-            
-            # Get fundamental data if available
-            fundamental_data = None
-            if instrument:
-                fundamental_data = self.db.query(FundamentalData).filter(
-                    FundamentalData.instrument_id == instrument.id,
-                    FundamentalData.date == date
-                ).first()
+        generation_times = _format_datetimes([s.generation_time for s in signals], DATETIME_FORMAT)
+        for signal, generation_time in zip(signals, generation_times):
+            factors = factors_by_signal.get(signal.id, [])
+            fundamental_data = fundamental_by_symbol.get(signal.symbol)
             
             signal_detail = {
                 "id": signal.id,
@@ -222,7 +274,7 @@ class SevenDTEReportingService(ReportingService):
                 "confidence": signal.confidence,
                 "status": signal.status,
                 "result": signal.result,
-                "generation_time": signal.generation_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "generation_time": generation_time,
                 "factors": [
                     {
                         "name": f.factor_name,
@@ -246,15 +298,42 @@ class SevenDTEReportingService(ReportingService):
             
             signal_details.append(signal_detail)
         
+        # Count executed and winning signals once
+        executed_signals = [s for s in signals if s.status == SignalStatus.EXECUTED]
+        executed_count = len(executed_signals)
+        winning_count = sum(1 for s in executed_signals if s.result == "win")
+        
         return {
             "signal_count": len(signals),
-            "executed_count": len([s for s in signals if s.status == SignalStatus.EXECUTED]),
-            "win_rate": len([s for s in signals if s.result == "win"]) / len([s for s in signals if s.status == SignalStatus.EXECUTED]) if [s for s in signals if s.status == SignalStatus.EXECUTED] else 0,
+            "executed_count": executed_count,
+            "win_rate": winning_count / executed_count if executed_count else 0,
             "source_performance": source_performance,
             "category_importance": category_importance,
             "signal_details": signal_details
         }
     
+    def _get_fundamental_data_by_symbol(self, symbols: set, date: datetime.date) -> Dict[str, FundamentalData]:
+        """Get fundamental data for the given symbols on a date with two queries, keyed by symbol."""
+        if not symbols:
+            return {}
+        
+        instruments = self.db.query(Instrument).filter(Instrument.symbol.in_(symbols)).all()
+        if not instruments:
+            return {}
+        
+        fundamental_by_instrument = {}
+        for fundamental_data in self.db.query(FundamentalData).filter(
+            FundamentalData.instrument_id.in_([i.id for i in instruments]),
+            FundamentalData.date == date
+        ).all():
+            fundamental_by_instrument.setdefault(fundamental_data.instrument_id, fundamental_data)
+        
+        return {
+            instrument.symbol: fundamental_by_instrument[instrument.id]
+            for instrument in instruments
+            if instrument.id in fundamental_by_instrument
+        }
+    
     async def _generate_trade_execution(self, date: datetime.date, portfolio_id: int) -> Dict[str, Any]:
         """Generate trade execution section for 7DTE system."""
         # Get trades for the day
@@ -274,21 +353,17 @@ class SevenDTEReportingService(ReportingService):
         # Calculate execution time
         avg_execution_time = sum((t.execution_time - t.signal_time).total_seconds() for t in trades if t.signal_time is not None) / len([t for t in trades if t.signal_time is not None]) if [t for t in trades if t.signal_time is not None] else 0
         
-        # Get trade details
-        trade_details = []
-        for trade in trades:
-            trade_details.append({
-                "id": trade.id,
-                "symbol": trade.symbol,
-                "trade_type": trade.trade_type,
-                "direction": trade.direction,
-                "price": trade.price,
-                "quantity": trade.quantity,
-                "value": trade.price * trade.quantity,
-                "execution_time": trade.execution_time.strftime("%Y-%m-%d %H:%M:%S"),
-                "slippage": trade.slippage,
-                "commission": trade.commission
-            })
+        # Get trade details, built column-wise and converted to records once
+        trade_df = pd.DataFrame.from_records(
+            [(t.id, t.symbol, t.trade_type, t.direction, t.price, t.quantity, t.slippage, t.commission) for t in trades],
+            columns=["id", "symbol", "trade_type", "direction", "price", "quantity", "slippage", "commission"]
+        )
+        trade_df["value"] = trade_df["price"] * trade_df["quantity"]
+        trade_df["execution_time"] = _format_datetimes([t.execution_time for t in trades], DATETIME_FORMAT)
+        trade_details = _to_records(trade_df[[
+            "id", "symbol", "trade_type", "direction", "price", "quantity",
+            "value", "execution_time", "slippage", "commission"
+        ]])
         
         return {
             "total_trades": len(trades),
@@ -321,7 +396,8 @@ class SevenDTEReportingService(ReportingService):
         
         # Get open position details
         open_position_details = []
-        for position in open_positions:
+        open_entry_dates = _format_datetimes([p.entry_time for p in open_positions], DATETIME_FORMAT)
+        for position, entry_date in zip(open_positions, open_entry_dates):
             # Get current price
             market_data = self.db.query(MarketData).filter(
                 MarketData.symbol == position.symbol,
@@ -355,7 +431,7 @@ class SevenDTEReportingService(ReportingService):
                 "entry_price": position.entry_price,
                 "current_price": current_price,
                 "quantity": position.quantity,
-                "entry_date": position.entry_time.strftime("%Y-%m-%d %H:%M:%S"),
+                "entry_date": entry_date,
                 "unrealized_pnl": unrealized_pnl,
                 "unrealized_pnl_pct": unrealized_pnl_pct,
                 "days_held": days_held
@@ -372,32 +448,26 @@ class SevenDTEReportingService(ReportingService):
             
             open_position_details.append(position_detail)
         
-        # Get closed position details
-        closed_position_details = []
-        for position in closed_positions:
-            # Calculate realized P&L
-            realized_pnl = position.exit_price * position.quantity - position.entry_price * position.quantity
-            if position.direction == "short":
-                realized_pnl = -realized_pnl
-            
-            realized_pnl_pct = (realized_pnl / (position.entry_price * position.quantity)) * 100 if position.entry_price * position.quantity != 0 else 0
-            
-            # Calculate days held
-            days_held = (position.exit_time.date() - position.entry_time.date()).days
-            
-            closed_position_details.append({
-                "id": position.id,
-                "symbol": position.symbol,
-                "direction": position.direction,
-                "entry_price": position.entry_price,
-                "exit_price": position.exit_price,
-                "quantity": position.quantity,
-                "entry_date": position.entry_time.strftime("%Y-%m-%d %H:%M:%S"),
-                "exit_date": position.exit_time.strftime("%Y-%m-%d %H:%M:%S"),
-                "days_held": days_held,
-                "realized_pnl": realized_pnl,
-                "realized_pnl_pct": realized_pnl_pct
-            })
+        # Get closed position details, with realized P&L computed per column
+        closed_df = pd.DataFrame.from_records(
+            [(p.id, p.symbol, p.direction, p.entry_price, p.exit_price, p.quantity) for p in closed_positions],
+            columns=["id", "symbol", "direction", "entry_price", "exit_price", "quantity"]
+        )
+        cost_basis = closed_df["entry_price"] * closed_df["quantity"]
+        realized_pnl = closed_df["exit_price"] * closed_df["quantity"] - cost_basis
+        closed_df["realized_pnl"] = realized_pnl.where(closed_df["direction"] != "short", -realized_pnl)
+        closed_df["realized_pnl_pct"] = (closed_df["realized_pnl"] / cost_basis.where(cost_basis != 0) * 100).fillna(0)
+        
+        entry_times = pd.to_datetime(pd.Series([p.entry_time for p in closed_positions], dtype=object))
+        exit_times = pd.to_datetime(pd.Series([p.exit_time for p in closed_positions], dtype=object))
+        closed_df["days_held"] = (exit_times.dt.normalize() - entry_times.dt.normalize()).dt.days
+        closed_df["entry_date"] = entry_times.dt.strftime(DATETIME_FORMAT)
+        closed_df["exit_date"] = exit_times.dt.strftime(DATETIME_FORMAT)
+        
+        closed_position_details = _to_records(closed_df[[
+            "id", "symbol", "direction", "entry_price", "exit_price", "quantity",
+            "entry_date", "exit_date", "days_held", "realized_pnl", "realized_pnl_pct"
+        ]])
         
         return {
             "open_position_count": len(open_positions),
@@ -494,24 +564,27 @@ class SevenDTEReportingService(ReportingService):
             if prices:
                 price_data[symbol] = [p.close for p in prices]
         
-        # Calculate correlation matrix
-        for symbol1 in mag7_symbols:
-            row = []
-            for symbol2 in mag7_symbols:
-                if symbol1 in price_data and symbol2 in price_data:
-                    # Ensure both price series have the same length
-                    min_length = min(len(price_data[symbol1]), len(price_data[symbol2]))
-                    
-                    if min_length > 1:
-                        # Calculate correlation
-                        corr = np.corrcoef(price_data[symbol1][:min_length], price_data[symbol2][:min_length])[0, 1]
-                        row.append(corr)
-                    else:
-                        row.append(1.0 if symbol1 == symbol2 else 0.0)
-                else:
-                    row.append(1.0 if symbol1 == symbol2 else 0.0)
+        # Calculate correlation matrix of daily log returns in one matrix product.
+        # Symbols with fewer than two prices have no returns and keep the
+        # identity row, without shortening the other series; constant series
+        # correlate as 0.
+        corr_data = np.eye(len(mag7_symbols))
+        symbols_with_data = [symbol for symbol in mag7_symbols if len(price_data.get(symbol, ())) > 1]
+        min_length = min((len(price_data[symbol]) for symbol in symbols_with_data), default=0)
+        
+        if min_length > 1:
+            prices_matrix = np.array([price_data[symbol][:min_length] for symbol in symbols_with_data], dtype=np.float64)
+            returns = np.diff(np.log(prices_matrix), axis=1)
+            returns -= returns.mean(axis=1, keepdims=True)
+            norms = np.linalg.norm(returns, axis=1)
+            norms[norms == 0] = 1.0
+            corr = (returns @ returns.T) / np.outer(norms, norms)
+            np.fill_diagonal(corr, 1.0)
             
-            correlation_matrix["data"].append(row)
+            indices = [mag7_symbols.index(symbol) for symbol in symbols_with_data]
+            corr_data[np.ix_(indices, indices)] = corr
+        
+        correlation_matrix["data"] = corr_data.tolist()
         
         return {
             "portfolio_beta": portfolio_beta,
@@ -553,38 +626,41 @@ class SevenDTEReportingService(ReportingService):
         # This would typically come from a system monitoring service
         avg_response_time = 0.5  # Placeholder in seconds
         
-        # Calculate performance by signal category
-        signal_factors = []
+        # Calculate performance by signal category: fetch (signal_id, category) pairs
+        # and aggregate them against the signal outcomes with a single merge/groupby
+        category_performance = {}
         signal_ids = [s.id for s in signals]
         
         if signal_ids:
-            signal_factors = self.db.query(SignalFactor).filter(
-                SignalFactor.signal_id.in_(signal_ids)
-            ).all()
-        
-        # Group factors by category
-        factor_by_category = {}
-        for factor in signal_factors:
-            if factor.factor_category not in factor_by_category:
-                factor_by_category[factor.factor_category] = []
-            factor_by_category[factor.factor_category].append(factor)
-        
-        # Calculate performance by category
-        category_performance = {}
-        for category, factors in factor_by_category.items():
-            # Get signals with this category
-            signal_ids_with_category = set(f.signal_id for f in factors)
-            signals_with_category = [s for s in signals if s.id in signal_ids_with_category]
-            
-            executed_signals_with_category = [s for s in signals_with_category if s.status == SignalStatus.EXECUTED]
-            winning_signals_with_category = [s for s in executed_signals_with_category if s.result == "win"]
+            factor_df = pd.read_sql(
+                self.db.query(SignalFactor.signal_id, SignalFactor.factor_category).filter(
+                    SignalFactor.signal_id.in_(signal_ids)
+                ).statement,
+                self.db.connection()
+            ).drop_duplicates()
             
-            category_performance[category] = {
-                "signal_count": len(signals_with_category),
-                "executed_count": len(executed_signals_with_category),
-                "win_rate": (len(winning_signals_with_category) / len(executed_signals_with_category)) * 100 if executed_signals_with_category else 0,
-                "avg_confidence": sum(s.confidence for s in signals_with_category) / len(signals_with_category) if signals_with_category else 0
-            }
+            if not factor_df.empty:
+                signal_df = pd.DataFrame.from_records(
+                    [(s.id, s.status == SignalStatus.EXECUTED, s.result == "win", s.confidence) for s in signals],
+                    columns=["signal_id", "executed", "win", "confidence"]
+                )
+                signal_df["won"] = signal_df["executed"] & signal_df["win"]
+                
+                category_stats = factor_df.merge(signal_df, on="signal_id").groupby("factor_category").agg(
+                    signal_count=("signal_id", "size"),
+                    executed_count=("executed", "sum"),
+                    won_count=("won", "sum"),
+                    avg_confidence=("confidence", "mean")
+                )
+                
+                for category, stats in category_stats.iterrows():
+                    executed_count = int(stats["executed_count"])
+                    category_performance[category] = {
+                        "signal_count": int(stats["signal_count"]),
+                        "executed_count": executed_count,
+                        "win_rate": (int(stats["won_count"]) / executed_count) * 100 if executed_count else 0,
+                        "avg_confidence": float(stats["avg_confidence"])
+                    }
         
         return {
             "signal_accuracy": signal_accuracy,
@@ -596,28 +672,25 @@ class SevenDTEReportingService(ReportingService):
             "category_performance": category_performance
         }
     
-    async def _generate_next_day_outlook(self, date: datetime.date, portfolio_id: int) -> Dict[str, Any]:
+    async def _generate_next_day_outlook(self, date: datetime.date, portfolio_id: int) -> NextDayOutlook:
         """Generate next day outlook section for 7DTE system."""
-        # Get market data
-        market_data = self.db.query(MarketData).filter(
-            MarketData.symbol == "SPY",
+        # Normalize to a date so expiration arithmetic is day-based
+        if isinstance(date, datetime):
+            date = date.date()
+        
+        # Get SPY and VIX market data in one query
+        market_rows = {}
+        for row in self.db.query(MarketData).filter(
+            MarketData.symbol.in_(["SPY", "VIX"]),
             MarketData.date == date
-        ).first()
-        
-        vix_data = self.db.query(MarketData).filter(
-            MarketData.symbol == "VIX",
-            MarketData.date == date
-        ).first()
+        ).all():
+            market_rows.setdefault(row.symbol, row)
         
-        # Get market condition
-        market_condition = self.db.query(MarketCondition).filter(
-            MarketCondition.date == date
-        ).first()
+        market_data = market_rows.get("SPY")
+        vix_data = market_rows.get("VIX")
         
         # Determine next trading day
-        next_day = date + timedelta(days=1)
-        while next_day.weekday() >= 5:  # Skip weekends
-            next_day += timedelta(days=1)
+        next_day = date + timedelta(days=_NEXT_BIZDAY_OFFSET[date.weekday()])  # Skip weekends
         
         # Determine market outlook
         market_outlook = "Neutral"
@@ -636,52 +709,57 @@ class SevenDTEReportingService(ReportingService):
         
         # Get upcoming earnings
         next_week = date + timedelta(days=7)
-        upcoming_earnings = []
-        
-        fundamental_data_upcoming = self.db.query(FundamentalData).filter(
+        upcoming_earnings: List[UpcomingEarnings] = []
+        
+        # Join the instrument symbol in the same query instead of looking it up per row
+        earnings_rows = self.db.query(
+            Instrument.symbol,
+            FundamentalData.next_earnings_date,
+            FundamentalData.earnings_time,
+            FundamentalData.estimated_eps
+        ).join(
+            Instrument, Instrument.id == FundamentalData.instrument_id
+        ).filter(
             FundamentalData.next_earnings_date >= next_day,
             FundamentalData.next_earnings_date <= next_week
         ).all()
         
-        for data in fundamental_data_upcoming:
-            instrument = self.db.query(Instrument).filter(Instrument.id == data.instrument_id).first()
-            
-            if instrument:
-                upcoming_earnings.append({
-                    "symbol": instrument.symbol,
-                    "date": data.next_earnings_date.strftime("%Y-%m-%d"),
-                    "time": data.earnings_time,
-                    "estimated_eps": data.estimated_eps
-                })
+        earnings_dates = _format_datetimes([row.next_earnings_date for row in earnings_rows], DATE_FORMAT)
+        
+        for row, earnings_date in zip(earnings_rows, earnings_dates):
+            upcoming_earnings.append({
+                "symbol": row.symbol,
+                "date": earnings_date,
+                "time": row.earnings_time,
+                "estimated_eps": row.estimated_eps
+            })
         
         # Get expiring options
         # This would typically come from a separate options data service
         expiring_options = []
         
-        # Get positions approaching expiration
-        positions_approaching_expiration = []
-        for position in self.db.query(Position).filter(
+        # Get positions approaching expiration (within 3 days), filtered in the database
+        expiration_cutoff = date + timedelta(days=3)
+        rows = self.db.query(
+            Position.id,
+            Position.symbol,
+            Position.direction,
+            Position.entry_price,
+            (cast(Position.expiration_date, Date) - date).label("days_to_expiration")
+        ).filter(
             Position.portfolio_id == portfolio_id,
-            Position.is_open == True
-        ).all():
-            # Calculate days to expiration
-            if position.expiration_date:
-                days_to_expiration = (position.expiration_date - date).days
-                
-                if days_to_expiration <= 3:  # Approaching expiration
-                    positions_approaching_expiration.append({
-                        "id": position.id,
-                        "symbol": position.symbol,
-                        "direction": position.direction,
-                        "entry_price": position.entry_price,
-                        "days_to_expiration": days_to_expiration
-                    })
-        
-        return {
-            "next_trading_day": next_day.strftime("%Y-%m-%d"),
-            "market_outlook": market_outlook,
-            "expected_volatility": expected_volatility,
-            "upcoming_earnings": upcoming_earnings,
-            "positions_approaching_expiration": positions_approaching_expiration
-        }
+            Position.is_open == True,
+            Position.expiration_date.isnot(None),
+            Position.expiration_date >= date,
+            Position.expiration_date <= expiration_cutoff
+        ).all()
+        positions_approaching_expiration: List[PositionSummary] = [dict(zip(_POS_KEYS, row)) for row in rows]
+        
+        return NextDayOutlook(
+            next_trading_day=next_day.strftime("%Y-%m-%d"),
+            market_outlook=market_outlook,
+            expected_volatility=expected_volatility,
+            upcoming_earnings=upcoming_earnings,
+            positions_approaching_expiration=positions_approaching_expiration
+        )
 
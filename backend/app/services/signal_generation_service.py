@@ -1,12 +1,23 @@
 import os
+import io
+import csv
 import asyncio
+import bisect
+import functools
 import logging
 import json
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any
-import pandas as pd
+import time
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from statistics import fmean
+from datetime import date, datetime, timedelta
+from typing import Awaitable, Callable, Dict, List, Optional, Any, FrozenSet, Tuple, Union
 import numpy as np
-from sqlalchemy.orm import Session
+import redis.asyncio as redis
+from sqlalchemy import func, insert, lambda_stmt, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, scoped_session
 from influxdb_client import InfluxDBClient
 from influxdb_client.client.flux_table import FluxTable
 
@@ -14,12 +25,13 @@ from app.config import settings
 from app.database import get_db, SessionLocal
 from app.models.market_data import (
     Instrument, StockPrice, Option, OptionPriceData, 
-    EarningsData, FinancialMetric, AnalystRating
+    EarningsData, FinancialMetric, AnalystRating, VolatilityData
 )
 from app.models.signal import (
     Signal, SignalType, SignalSource, SignalStatus,
     SignalFactor
 )
+from app.services._ta_kernels import MIN_TA_BARS, TechnicalTail, compute_ta_tail
 
 # Configure logging
 logging.basicConfig(
@@ -28,583 +40,834 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Initialize InfluxDB client
-influxdb_client = InfluxDBClient(
-    url=settings.INFLUXDB_URL,
-    token=settings.INFLUXDB_TOKEN,
-    org=settings.INFLUXDB_ORG
+# Technical signal templates keyed by (indicator, setup)
+SIGNAL_TEMPLATES = {
+    ('rsi', 'oversold'): {
+        'signal_type': SignalType.LONG_CALL,
+        'option_type': 'call',
+        'target_price': lambda tail: tail.close * 1.05,  # 5% profit target
+        'stop_loss': lambda tail: tail.close * 0.97,  # 3% stop loss
+        'confidence': lambda tail: (30 - tail.rsi) / 30  # Higher confidence for lower RSI
+    },
+    ('rsi', 'overbought'): {
+        'signal_type': SignalType.LONG_PUT,
+        'option_type': 'put',
+        'target_price': lambda tail: tail.close * 0.95,  # 5% profit target
+        'stop_loss': lambda tail: tail.close * 1.03,  # 3% stop loss
+        'confidence': lambda tail: (tail.rsi - 70) / 30  # Higher confidence for higher RSI
+    },
+    ('macd', 'bullish'): {
+        'signal_type': SignalType.LONG_CALL,
+        'option_type': 'call',
+        'target_price': lambda tail: tail.close * 1.05,
+        'stop_loss': lambda tail: tail.close * 0.97,
+        'confidence': lambda tail: 0.7  # Fixed confidence for MACD crossover
+    },
+    ('macd', 'bearish'): {
+        'signal_type': SignalType.LONG_PUT,
+        'option_type': 'put',
+        'target_price': lambda tail: tail.close * 0.95,
+        'stop_loss': lambda tail: tail.close * 1.03,
+        'confidence': lambda tail: 0.7
+    },
+    ('bollinger', 'lower_break'): {
+        'signal_type': SignalType.LONG_CALL,
+        'option_type': 'call',
+        'target_price': lambda tail: tail.sma,  # Target the middle band (SMA)
+        'stop_loss': lambda tail: tail.close * 0.97,
+        'confidence': lambda tail: 0.65  # Fixed confidence for Bollinger Band signal
+    },
+    ('bollinger', 'upper_break'): {
+        'signal_type': SignalType.LONG_PUT,
+        'option_type': 'put',
+        'target_price': lambda tail: tail.sma,
+        'stop_loss': lambda tail: tail.close * 1.03,
+        'confidence': lambda tail: 0.65
+    },
+}
+
+# Signal types counted as bullish or bearish by the ensemble
+_BULLISH = frozenset({SignalType.LONG_CALL, SignalType.SHORT_PUT})
+_BEARISH = frozenset({SignalType.LONG_PUT, SignalType.SHORT_CALL})
+
+# Ensemble signal parameters by side as (signal type, option type, target
+# ratio, stop loss ratio): 5% profit target, 3% stop loss
+_ENSEMBLE_SIDES = {
+    'bullish': (SignalType.LONG_CALL, 'call', 1.05, 0.97),
+    'bearish': (SignalType.LONG_PUT, 'put', 0.95, 1.03)
+}
+
+# Valuation rules as (matches(pe, peg), option type, signal type, target
+# ratio, stop loss ratio), checked in order
+VALUATION_RULES = [
+    # Undervalued: 5% profit target, 3% stop loss
+    (lambda pe, peg: pe < 15 and peg < 1.0, 'call', SignalType.LONG_CALL, 1.05, 0.97),
+    # Overvalued: 5% profit target, 3% stop loss
+    (lambda pe, peg: pe > 30 and peg > 2.0, 'put', SignalType.LONG_PUT, 0.95, 1.03),
+]
+
+# Notes templates for non-technical signals. Signal data carries
+# (template key, *args) and save_signal() formats the notes only for a
+# signal that is actually written.
+NOTES_TEMPLATES = {
+    'earnings': "Earnings play for %s. Earnings date: %s. Historical positive surprise ratio: %.2f",
+    'valuation': "Valuation signal for %s. PE Ratio: %.2f, PEG Ratio: %.2f",
+    'iv_percentile': "%s IV percentile signal for %s. IV Percentile: %.2f%%, IV Rank: %.2f%%",
+    'ensemble': "Ensemble %s signal for %s based on %d component signals.",
+}
+
+@dataclass(slots=True)
+class SignalPayload:
+    """Column values for a generated signal, turned into a row dict only when saved."""
+    instrument_id: int
+    signal_type: SignalType
+    signal_source: SignalSource
+    target_price: float
+    stop_loss: float
+    confidence_score: float
+    option_id: int
+    option_strike: float
+    option_expiration: datetime
+    parameters: Dict[str, Any]
+    notes: Any
+    status: SignalStatus = SignalStatus.PENDING
+    entry_price: Optional[float] = None  # Will be set when executed
+    time_frame: str = '7d'
+    
+    def as_row(self) -> Dict[str, Any]:
+        """Return the payload as a Signal column mapping."""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+@functools.cache
+def get_influxdb_client() -> InfluxDBClient:
+    """Create the InfluxDB client on first use rather than at import time."""
+    return InfluxDBClient(
+        url=settings.INFLUXDB_URL,
+        token=settings.INFLUXDB_TOKEN,
+        org=settings.INFLUXDB_ORG
+    )
+
+def get_query_api():
+    """Get the InfluxDB query API from the lazily created client."""
+    return get_influxdb_client().query_api()
+
+@functools.cache
+def get_redis_client() -> redis.Redis:
+    """Create the Redis client for the market data cache on first use."""
+    return redis.from_url(settings.REDIS_URL, decode_responses=True)
+
+@functools.lru_cache(maxsize=1)
+def _seven_dte_window(today: date) -> Tuple[date, date]:
+    """Get the expiration bracket around 7 DTE (7 days +/- 2) for a given day."""
+    return today + timedelta(days=5), today + timedelta(days=9)
+
+# Signal factor columns written by COPY. created_at has no server default,
+# so it is supplied with each row. NULLs are written as \N so that empty
+# strings survive the CSV round trip.
+_FACTOR_COPY_COLUMNS = (
+    'signal_id', 'factor_name', 'factor_value', 'factor_weight',
+    'factor_category', 'factor_description', 'created_at'
 )
-query_api = influxdb_client.query_api()
+
+# Option columns needed to place a signal. Selected as plain rows so ATM
+# lookups skip ORM entity hydration.
+_OPTION_COLUMNS = (Option.id, Option.strike_price, Option.expiration_date, Option.option_type)
+
+def ttl_cache(seconds: float, freshness=None, freshness_interval: float = 10):
+    """
+    Skip a per-instrument generate_*_signals method if it already ran for the
+    instrument within the last `seconds`.
+    
+    Only completed runs start the TTL: a run that raises or returns False
+    (e.g. after a database error) is retried on the next call.
+    
+    freshness(self, instrument), if given, returns a marker for the latest
+    ingested input (e.g. the newest metric date); a changed marker runs the
+    method even inside the TTL. Once the TTL has expired the method runs
+    whatever the marker. Inside the TTL it is checked at most once every
+    `freshness_interval` seconds per instrument, so other cache hits cost no
+    query.
+    """
+    def decorator(method):
+        # (run time, marker at the run, last freshness check time) by generator and instrument
+        last_runs: Dict[Tuple[str, int], Tuple[float, Any, float]] = {}
+        
+        @functools.wraps(method)
+        async def wrapper(self, instrument: Instrument):
+            key = (type(self).__name__, instrument.id)
+            now = time.monotonic()
+            
+            last_run = last_runs.get(key)
+            if last_run and now - last_run[0] < seconds:
+                run_at, run_marker, checked_at = last_run
+                if not freshness or now - checked_at < freshness_interval:
+                    return
+                
+                marker = freshness(self, instrument)
+                if marker == run_marker:
+                    last_runs[key] = (run_at, run_marker, now)
+                    return
+            else:
+                marker = freshness(self, instrument) if freshness else None
+            
+            result = await method(self, instrument)
+            if result is not False:
+                last_runs[key] = (now, marker, now)
+            return result
+        
+        return wrapper
+    
+    return decorator
+
+def _latest_metric_date(generator, instrument: Instrument):
+    """Freshness marker for valuation signals: the newest financial metric date."""
+    return generator.db.query(func.max(FinancialMetric.date)).filter(
+        FinancialMetric.instrument_id == instrument.id
+    ).scalar()
+
+def _latest_volatility_date(generator, instrument: Instrument):
+    """Freshness marker for IV signals: the newest volatility data date."""
+    return generator.db.query(func.max(VolatilityData.date)).filter(
+        VolatilityData.instrument_id == instrument.id
+    ).scalar()
+
+# Signal column values as a SignalPayload or a plain dict
+SignalData = Union[SignalPayload, Dict[str, Any]]
+
+# Per-symbol signal generation run by _gather_symbols as generate(generator, symbol)
+SymbolGenerator = Callable[["SignalGenerator", str], Awaitable[None]]
+
+# Instrument ids by symbol. Mag7 instrument rows do not change, so each
+# symbol is resolved once per process.
+_instrument_ids: Dict[str, int] = {}
+
+# Bound concurrent per-symbol sessions across all generator threads by the
+# connection pool size so the fan-out cannot exhaust the pool
+_symbol_session_slots = threading.BoundedSemaphore(settings.DB_POOL_SIZE)
 
 class SignalGenerator:
     """Base class for signal generators."""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, session_factory: Callable[[], Session] = SessionLocal):
         self.db = db
+        # Creates the extra sessions for loads and per-symbol work that run
+        # off the calling thread
+        self.session_factory = session_factory
+        # Latest close by instrument id, reset at the start of each run
+        self._price_cache: Dict[int, float] = {}
+        # Instruments by symbol, loaded at the start of each run
+        self._instrument_cache: Dict[str, Instrument] = {}
+        # 7 DTE options keyed by (instrument_id, option_type) as strike-sorted
+        # options alongside their strike list for binary search
+        self._option_cache: Dict[Tuple[int, str], Tuple[List[Row], List[float]]] = {}
+        self._refresh_clock()
+    
+    def _refresh_clock(self, now: Optional[datetime] = None):
+        """Capture the run's time, or the caller's cycle time, and its 7 DTE expiration window."""
+        self._price_cache.clear()
+        self._now = now or datetime.utcnow()
+        self._exp_min, self._exp_max = _seven_dte_window(self._now.date())
+    
+    def _get_instrument_ids(self, symbols: List[str]) -> Dict[str, int]:
+        """Resolve instrument ids by symbol, querying only symbols not seen before."""
+        missing = [symbol for symbol in symbols if symbol not in _instrument_ids]
+        if missing:
+            _instrument_ids.update(
+                self.db.query(Instrument.symbol, Instrument.id).filter(
+                    Instrument.symbol.in_(missing)
+                ).all()
+            )
+        
+        return {symbol: _instrument_ids[symbol] for symbol in symbols if symbol in _instrument_ids}
+    
+    def _load_instruments(self, symbols: List[str]):
+        """Load the run's instruments with a single IN query."""
+        self._instrument_cache = {
+            instrument.symbol: instrument
+            for instrument in self.db.query(Instrument).filter(Instrument.symbol.in_(symbols)).all()
+        }
+    
+    def _get_instrument(self, symbol: str) -> Optional[Instrument]:
+        """Get an instrument by symbol from the run's cache, querying on a miss."""
+        if symbol not in self._instrument_cache:
+            instrument = self.db.query(Instrument).filter(Instrument.symbol == symbol).first()
+            if not instrument:
+                return None
+            self._instrument_cache[symbol] = instrument
+        
+        return self._instrument_cache[symbol]
+    
+    def _load_latest_closes(self, instrument_ids: List[int]):
+        """Load the latest close for several instruments with one DISTINCT ON (instrument_id) query."""
+        self._price_cache.update(
+            self.db.execute(
+                select(StockPrice.instrument_id, StockPrice.close).where(
+                    StockPrice.instrument_id.in_(instrument_ids),
+                    StockPrice.close.isnot(None)
+                ).order_by(
+                    StockPrice.instrument_id,
+                    StockPrice.timestamp.desc()
+                ).distinct(StockPrice.instrument_id)
+            ).all()
+        )
+    
+    def _get_latest_close(self, instrument_id: int) -> Optional[float]:
+        """Get the latest close for an instrument, querying once per run."""
+        if instrument_id not in self._price_cache:
+            close = self.db.query(StockPrice.close).filter(
+                StockPrice.instrument_id == instrument_id
+            ).order_by(StockPrice.timestamp.desc()).limit(1).scalar()
+            if close is None:
+                return None
+            self._price_cache[instrument_id] = close
+        
+        return self._price_cache[instrument_id]
+    
+    def _load_option_cache(self, instrument_ids: List[int]) -> Dict[Tuple[int, str], Tuple[List[Row], List[float]]]:
+        """Load 7 DTE calls and puts, bucketed by (instrument_id, option_type) and sorted by strike."""
+        db = self.session_factory()
+        try:
+            options = db.execute(
+                select(Option.instrument_id, *_OPTION_COLUMNS).where(
+                    Option.instrument_id.in_(instrument_ids),
+                    Option.expiration_date >= self._exp_min,
+                    Option.expiration_date <= self._exp_max,
+                    Option.option_type.in_(['call', 'put'])
+                ).order_by(Option.strike_price)
+            ).all()
+        finally:
+            db.close()
+        
+        grouped_options: Dict[Tuple[int, str], List[Row]] = {}
+        for option in options:
+            grouped_options.setdefault((option.instrument_id, option.option_type), []).append(option)
+        
+        return {
+            key: (group, [option.strike_price for option in group])
+            for key, group in grouped_options.items()
+        }
+    
+    def _find_atm_option(self, instrument_id: int, option_type: str, current_price: float) -> Optional[Row]:
+        """Find the cached 7 DTE option with the strike closest to the current price."""
+        cached = self._option_cache.get((instrument_id, option_type))
+        if not cached:
+            return None
+        
+        options, strikes = cached
+        idx = bisect.bisect_left(strikes, current_price)
+        
+        # Step back to the lower neighbour when it is at least as close
+        if idx == len(strikes) or (idx > 0 and current_price - strikes[idx - 1] <= strikes[idx] - current_price):
+            idx -= 1
+        
+        return options[idx]
+    
+    def _query_atm_option(
+        self,
+        instrument_id: int,
+        option_type: str,
+        current_price: float,
+        min_expiration: Optional[datetime] = None,
+        max_expiration: Optional[datetime] = None
+    ) -> Optional[Row]:
+        """Select the option closest to the money in the database, defaulting to the 7 DTE window."""
+        return self.db.query(*_OPTION_COLUMNS).filter(
+            Option.instrument_id == instrument_id,
+            Option.expiration_date.between(min_expiration or self._exp_min, max_expiration or self._exp_max),
+            Option.option_type == option_type
+        ).order_by(func.abs(Option.strike_price - current_price), Option.strike_price).limit(1).first()
+    
+    def _query_atm_straddle(self, instrument_id: int, current_price: Optional[float] = None) -> Dict[str, Row]:
+        """
+        Select the 7 DTE ATM call and put together with DISTINCT ON (option_type).
+        
+        Without a current price, the latest close is resolved by a scalar
+        subquery in the same statement, saving a round trip.
+        """
+        stmt = select(*_OPTION_COLUMNS).where(
+            Option.instrument_id == instrument_id,
+            Option.expiration_date.between(self._exp_min, self._exp_max),
+            Option.option_type.in_(['call', 'put'])
+        )
+        
+        if current_price is None:
+            current_price = select(StockPrice.close).where(
+                StockPrice.instrument_id == instrument_id
+            ).order_by(StockPrice.timestamp.desc()).limit(1).scalar_subquery()
+            stmt = stmt.where(current_price.isnot(None))
+        
+        stmt = stmt.order_by(
+            Option.option_type,
+            func.abs(Option.strike_price - current_price),
+            Option.strike_price
+        ).distinct(Option.option_type)
+        
+        return {option.option_type: option for option in self.db.execute(stmt)}
+    
+    def _fork(self, db: Session) -> "SignalGenerator":
+        """Create a generator of the same type on another session, sharing this run's clock."""
+        generator = type(self)(db, self.session_factory)
+        generator._now = self._now
+        generator._exp_min = self._exp_min
+        generator._exp_max = self._exp_max
+        # Instruments are only read by the forks, so they can share this
+        # run's loaded instances; misses stay in the fork's own copy
+        generator._instrument_cache = dict(self._instrument_cache)
+        generator._price_cache.update(self._price_cache)
+        generator._option_cache = self._option_cache
+        return generator
+    
+    def _generate_for_symbol_in_session(self, generate: SymbolGenerator, symbol: str):
+        """Generate signals for one symbol on a dedicated session."""
+        with _symbol_session_slots:
+            db = self.session_factory()
+            try:
+                generator = self._fork(db)
+                asyncio.run(generate(generator, symbol))
+            finally:
+                db.close()
     
-    async def generate_signals(self):
-        """Generate signals for all instruments."""
+    async def _gather_symbols(self, symbols: List[str], generate: SymbolGenerator):
+        """
+        Generate signals for symbols concurrently, one thread and session per symbol.
+        
+        generate(generator, symbol) runs on a fork of this generator bound to the symbol's session.
+        """
+        await asyncio.gather(*[
+            asyncio.to_thread(self._generate_for_symbol_in_session, generate, symbol)
+            for symbol in symbols
+        ])
+    
+    async def generate_signals(self, now: Optional[datetime] = None):
+        """Generate signals for all instruments, optionally at a cycle time shared with a caller."""
         raise NotImplementedError("Subclasses must implement generate_signals method")
     
-    def save_signal(self, signal_data: Dict[str, Any]):
-        """Save signal to database."""
+    @staticmethod
+    def _signal_row(signal_data: SignalData) -> Dict[str, Any]:
+        """Convert a payload to a row and render deferred ('template', *args) notes."""
+        if isinstance(signal_data, SignalPayload):
+            signal_data = signal_data.as_row()
+        notes = signal_data.get('notes')
+        if isinstance(notes, tuple):
+            return dict(signal_data, notes=NOTES_TEMPLATES[notes[0]] % notes[1:])
+        return signal_data
+    
+    def save_signal(self, signal_data: SignalData, factors: Optional[List[Dict[str, Any]]] = None):
+        """Save signal and its factors to database in a single transaction."""
         try:
-            # Create signal
-            signal = Signal(**signal_data)
+            # Create signal and flush to assign its primary key
+            signal = Signal(**self._signal_row(signal_data))
             self.db.add(signal)
+            self.db.flush()
+            signal_id, instrument_id = signal.id, signal.instrument_id
+            
+            # Write factors in the same transaction so the signal commits with them
+            if factors:
+                created_at = datetime.utcnow()
+                self._copy_signal_factors([
+                    dict(factor_data, signal_id=signal_id, created_at=created_at)
+                    for factor_data in factors
+                ])
+            
             self.db.commit()
-            self.db.refresh(signal)
             
-            logger.info(f"Created signal: {signal.id} for instrument {signal.instrument_id}")
+            logger.info(f"Created signal: {signal_id} for instrument {instrument_id}")
             return signal
         except Exception as e:
             self.db.rollback()
             logger.error(f"Error saving signal: {e}")
             return None
     
-    def save_signal_factor(self, signal_id: int, factor_data: Dict[str, Any]):
-        """Save signal factor to database."""
+    def save_signals(self, signals: List[Tuple[SignalData, List[Dict[str, Any]]]]) -> List[int]:
+        """Save signals and their factors with one multi-row insert each and a single commit."""
+        if not signals:
+            return []
+        
         try:
-            # Create signal factor
-            factor_data["signal_id"] = signal_id
-            factor = SignalFactor(**factor_data)
-            self.db.add(factor)
+            signal_ids = self.db.execute(
+                insert(Signal).returning(Signal.id, sort_by_parameter_order=True),
+                [self._signal_row(signal_data) for signal_data, _ in signals]
+            ).scalars().all()
+            
+            factor_rows = [
+                dict(factor_data, signal_id=signal_id)
+                for signal_id, (_, factors) in zip(signal_ids, signals)
+                for factor_data in factors
+            ]
+            if factor_rows:
+                created_at = datetime.utcnow()
+                for row in factor_rows:
+                    row['created_at'] = created_at
+                self._copy_signal_factors(factor_rows)
+            
             self.db.commit()
             
-            logger.info(f"Created signal factor for signal {signal_id}: {factor_data['factor_name']}")
-            return factor
+            logger.info(f"Created {len(signal_ids)} signals: {signal_ids}")
+            return signal_ids
         except Exception as e:
             self.db.rollback()
-            logger.error(f"Error saving signal factor: {e}")
-            return None
+            logger.error(f"Error saving signals: {e}")
+            return []
+    
+    def save_signal_factors(self, signal_id: int, factors: List[Dict[str, Any]]) -> bool:
+        """Save signal factors for an existing signal with one COPY and commit."""
+        try:
+            created_at = datetime.utcnow()
+            self._copy_signal_factors([
+                dict(factor_data, signal_id=signal_id, created_at=created_at)
+                for factor_data in factors
+            ])
+            self.db.commit()
+            
+            logger.info(f"Created {len(factors)} signal factors for signal {signal_id}")
+            return True
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving signal factors: {e}")
+            return False
+    
+    def save_signal_factor(self, signal_id: int, factor_data: Dict[str, Any]) -> bool:
+        """Save a single signal factor for an existing signal."""
+        return self.save_signal_factors(signal_id, [factor_data])
+    
+    def _copy_signal_factors(self, factor_rows: List[Dict[str, Any]]):
+        """
+        Stream signal factor rows into the current transaction with COPY FROM STDIN.
+        
+        COPY needs psycopg2; other drivers get an executemany INSERT instead.
+        """
+        connection = self.db.connection()
+        if connection.dialect.driver != "psycopg2":
+            self.db.execute(
+                insert(SignalFactor),
+                [{column: row.get(column) for column in _FACTOR_COPY_COLUMNS} for row in factor_rows]
+            )
+            return
+        
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator='\n')
+        for row in factor_rows:
+            writer.writerow([
+                '\\N' if value is None else value
+                for value in (row.get(column) for column in _FACTOR_COPY_COLUMNS)
+            ])
+        buffer.seek(0)
+        
+        cursor = connection.connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {SignalFactor.__tablename__} ({', '.join(_FACTOR_COPY_COLUMNS)}) "
+                f"FROM STDIN WITH (FORMAT csv, NULL '\\N')",
+                buffer
+            )
+        finally:
+            cursor.close()
 
 class TechnicalSignalGenerator(SignalGenerator):
     """Generate signals based on technical analysis."""
     
-    async def generate_signals(self):
+    async def generate_signals(self, now: Optional[datetime] = None):
         """Generate technical signals for all Mag7 stocks."""
-        for symbol in settings.MAG7_SYMBOLS:
-            try:
-                # Get instrument
-                instrument = self.db.query(Instrument).filter(Instrument.symbol == symbol).first()
-                if not instrument:
-                    logger.warning(f"Instrument {symbol} not found in database")
-                    continue
-                
-                # Get historical prices
-                end_date = datetime.utcnow()
-                start_date = end_date - timedelta(days=60)  # Need enough data for indicators
-                
-                prices = self.db.query(StockPrice).filter(
-                    StockPrice.instrument_id == instrument.id,
-                    StockPrice.timestamp >= start_date,
-                    StockPrice.timestamp <= end_date
-                ).order_by(StockPrice.timestamp).all()
-                
-                if not prices:
-                    logger.warning(f"No price data found for {symbol}")
-                    continue
-                
-                # Convert to DataFrame
-                df = pd.DataFrame([{
-                    'timestamp': p.timestamp,
-                    'open': p.open,
-                    'high': p.high,
-                    'low': p.low,
-                    'close': p.close,
-                    'volume': p.volume
-                } for p in prices])
-                
-                # Generate signals
-                await self.generate_rsi_signals(instrument, df)
-                await self.generate_macd_signals(instrument, df)
-                await self.generate_bollinger_signals(instrument, df)
-                
-            except Exception as e:
-                logger.error(f"Error generating technical signals for {symbol}: {e}")
+        self._refresh_clock(now)
+        
+        try:
+            # Get instrument ids
+            instrument_ids_by_symbol = self._get_instrument_ids(settings.MAG7_SYMBOLS)
+            instrument_ids = list(instrument_ids_by_symbol.values())
+            
+            # Load prices and options concurrently, each on its own session
+            async with asyncio.TaskGroup() as tg:
+                prices_task = tg.create_task(asyncio.to_thread(self._load_price_arrays, instrument_ids))
+                options_task = tg.create_task(asyncio.to_thread(self._load_option_cache, instrument_ids))
+            
+            price_arrays = prices_task.result()
+            self._option_cache = options_task.result()
+        except Exception as e:
+            logger.error(f"Error loading market data for technical signals: {e}")
+            return
+        
+        # Evaluate symbols concurrently off the event loop
+        results = await asyncio.gather(*[
+            asyncio.to_thread(self._process_symbol, symbol, instrument_ids_by_symbol.get(symbol), price_arrays)
+            for symbol in settings.MAG7_SYMBOLS
+        ])
+        
+        # Save all signals and their factors in a single transaction
+        self.save_signals([signal for symbol_signals in results for signal in symbol_signals])
     
-    async def generate_rsi_signals(self, instrument: Instrument, df: pd.DataFrame):
-        """Generate signals based on RSI indicator."""
+    def _load_price_arrays(self, instrument_ids: List[int]) -> Dict[int, Tuple[np.ndarray, np.ndarray]]:
+        """Load close and volume arrays for the indicator lookback window, keyed by instrument."""
+        end_date = self._now
+        start_date = end_date - timedelta(days=60)  # Need enough data for indicators
+        
+        db = self.session_factory()
         try:
-            # Calculate RSI
-            delta = df['close'].diff()
-            gain = delta.where(delta > 0, 0)
-            loss = -delta.where(delta < 0, 0)
+            rows = db.query(
+                StockPrice.instrument_id,
+                StockPrice.close,
+                func.coalesce(StockPrice.volume, 0)
+            ).filter(
+                StockPrice.instrument_id.in_(instrument_ids),
+                StockPrice.timestamp >= start_date,
+                StockPrice.timestamp <= end_date,
+                StockPrice.close.isnot(None)
+            ).order_by(StockPrice.instrument_id, StockPrice.timestamp).all()
+        finally:
+            db.close()
+        
+        # Build single-precision column arrays directly and split them per instrument
+        count = len(rows)
+        ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=count)
+        closes = np.fromiter((row[1] for row in rows), dtype=np.float32, count=count)
+        volumes = np.fromiter((row[2] for row in rows), dtype=np.float32, count=count)
+        
+        bounds = np.flatnonzero(np.diff(ids)) + 1
+        return {
+            int(ids[start]): (close, volume)
+            for start, close, volume in zip(
+                np.concatenate(([0], bounds)) if count else [],
+                np.split(closes, bounds),
+                np.split(volumes, bounds)
+            )
+        }
+    
+    def _process_symbol(
+        self,
+        symbol: str,
+        instrument_id: Optional[int],
+        price_arrays: Dict[int, Tuple[np.ndarray, np.ndarray]]
+    ) -> List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Evaluate technical setups for a single symbol and return the signals with their factors."""
+        try:
+            if instrument_id is None:
+                logger.warning(f"Instrument {symbol} not found in database")
+                return []
             
-            avg_gain = gain.rolling(window=14).mean()
-            avg_loss = loss.rolling(window=14).mean()
+            if instrument_id not in price_arrays:
+                logger.warning(f"No price data found for {symbol}")
+                return []
             
-            rs = avg_gain / avg_loss
-            rsi = 100 - (100 / (1 + rs))
+            close, volume = price_arrays[instrument_id]
+            if len(close) < MIN_TA_BARS:
+                logger.debug(f"Skipping {symbol}: {len(close)} bars, need {MIN_TA_BARS} for indicators")
+                return []
             
-            df['rsi'] = rsi
+            # Calculate all indicators in a single pass
+            tail = compute_ta_tail(close, volume)
             
-            # Get latest RSI value
-            latest_rsi = df['rsi'].iloc[-1]
+            # Generate signals
+            signals = [
+                self.generate_rsi_signals(symbol, instrument_id, tail),
+                self.generate_macd_signals(symbol, instrument_id, tail),
+                self.generate_bollinger_signals(symbol, instrument_id, tail)
+            ]
+            return [signal for signal in signals if signal]
             
-            # Generate signals based on RSI
-            if latest_rsi < 30:  # Oversold
-                # Check for options with 7 DTE
-                target_date = datetime.utcnow().date() + timedelta(days=7)
-                min_date = target_date - timedelta(days=2)
-                max_date = target_date + timedelta(days=2)
-                
-                options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'call'
-                ).all()
-                
-                if not options:
-                    logger.warning(f"No suitable options found for {instrument.symbol}")
-                    return
-                
-                # Find ATM option
-                current_price = df['close'].iloc[-1]
-                atm_option = min(options, key=lambda x: abs(x.strike_price - current_price))
-                
-                # Create signal
-                signal_data = {
-                    'instrument_id': instrument.id,
-                    'signal_type': SignalType.LONG_CALL,
-                    'signal_source': SignalSource.TECHNICAL,
-                    'status': SignalStatus.PENDING,
-                    'entry_price': None,  # Will be set when executed
-                    'target_price': current_price * 1.05,  # 5% profit target
-                    'stop_loss': current_price * 0.97,  # 3% stop loss
-                    'confidence_score': (30 - latest_rsi) / 30,  # Higher confidence for lower RSI
-                    'time_frame': '7d',
-                    'option_id': atm_option.id,
-                    'option_strike': atm_option.strike_price,
-                    'option_expiration': atm_option.expiration_date,
-                    'parameters': {
-                        'indicator': 'rsi',
-                        'rsi_value': latest_rsi,
-                        'rsi_period': 14
-                    },
-                    'notes': f"RSI oversold signal for {instrument.symbol}. RSI: {latest_rsi:.2f}"
-                }
-                
-                # Save signal
-                signal = self.save_signal(signal_data)
-                
-                if signal:
-                    # Save signal factors
-                    self.save_signal_factor({
+        except Exception as e:
+            logger.error(f"Error generating technical signals for {symbol}: {e}")
+            return []
+    
+    def _build_signal(
+        self,
+        template_key: Tuple[str, str],
+        symbol: str,
+        instrument_id: int,
+        tail: TechnicalTail,
+        parameters: Dict[str, Any],
+        notes: str
+    ) -> Optional[Dict[str, Any]]:
+        """Build technical signal data from a template and the nearest ATM 7 DTE option."""
+        template = SIGNAL_TEMPLATES[template_key]
+        
+        # Find ATM option with 7 DTE
+        atm_option = self._find_atm_option(instrument_id, template['option_type'], tail.close)
+        
+        if not atm_option:
+            logger.warning(f"No suitable options found for {symbol}")
+            return None
+        
+        return {
+            'instrument_id': instrument_id,
+            'signal_type': template['signal_type'],
+            'signal_source': SignalSource.TECHNICAL,
+            'status': SignalStatus.PENDING,
+            'entry_price': None,  # Will be set when executed
+            'target_price': template['target_price'](tail),
+            'stop_loss': template['stop_loss'](tail),
+            'confidence_score': template['confidence'](tail),
+            'time_frame': '7d',
+            'option_id': atm_option.id,
+            'option_strike': atm_option.strike_price,
+            'option_expiration': atm_option.expiration_date,
+            'parameters': parameters,
+            'notes': notes
+        }
+    
+    def generate_rsi_signals(self, symbol: str, instrument_id: int, tail: TechnicalTail) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
+        """Generate signals based on RSI indicator."""
+        try:
+            if tail.rsi < 30:
+                setup = 'oversold'
+            elif tail.rsi > 70:
+                setup = 'overbought'
+            else:
+                return
+            
+            signal_data = self._build_signal(
+                ('rsi', setup),
+                symbol,
+                instrument_id,
+                tail,
+                {
+                    'indicator': 'rsi',
+                    'rsi_value': tail.rsi,
+                    'rsi_period': 14
+                },
+                f"RSI {setup} signal for {symbol}. RSI: {tail.rsi:.2f}"
+            )
+            
+            if signal_data:
+                return signal_data, [
+                    {
                         'factor_name': 'rsi',
-                        'factor_value': latest_rsi,
+                        'factor_value': tail.rsi,
                         'factor_weight': 0.7,
                         'factor_category': 'technical',
-                        'factor_description': f"RSI(14) value: {latest_rsi:.2f}"
-                    })
-                    
-                    # Add volume factor
-                    volume_change = df['volume'].iloc[-1] / df['volume'].iloc[-5:].mean()
-                    self.save_signal_factor({
-                        'factor_name': 'volume_change',
-                        'factor_value': volume_change,
-                        'factor_weight': 0.3,
-                        'factor_category': 'technical',
-                        'factor_description': f"Volume change: {volume_change:.2f}x average"
-                    })
-            
-            elif latest_rsi > 70:  # Overbought
-                # Check for options with 7 DTE
-                target_date = datetime.utcnow().date() + timedelta(days=7)
-                min_date = target_date - timedelta(days=2)
-                max_date = target_date + timedelta(days=2)
-                
-                options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'put'
-                ).all()
-                
-                if not options:
-                    logger.warning(f"No suitable options found for {instrument.symbol}")
-                    return
-                
-                # Find ATM option
-                current_price = df['close'].iloc[-1]
-                atm_option = min(options, key=lambda x: abs(x.strike_price - current_price))
-                
-                # Create signal
-                signal_data = {
-                    'instrument_id': instrument.id,
-                    'signal_type': SignalType.LONG_PUT,
-                    'signal_source': SignalSource.TECHNICAL,
-                    'status': SignalStatus.PENDING,
-                    'entry_price': None,  # Will be set when executed
-                    'target_price': current_price * 0.95,  # 5% profit target
-                    'stop_loss': current_price * 1.03,  # 3% stop loss
-                    'confidence_score': (latest_rsi - 70) / 30,  # Higher confidence for higher RSI
-                    'time_frame': '7d',
-                    'option_id': atm_option.id,
-                    'option_strike': atm_option.strike_price,
-                    'option_expiration': atm_option.expiration_date,
-                    'parameters': {
-                        'indicator': 'rsi',
-                        'rsi_value': latest_rsi,
-                        'rsi_period': 14
+                        'factor_description': f"RSI(14) value: {tail.rsi:.2f}"
                     },
-                    'notes': f"RSI overbought signal for {instrument.symbol}. RSI: {latest_rsi:.2f}"
-                }
-                
-                # Save signal
-                signal = self.save_signal(signal_data)
-                
-                if signal:
-                    # Save signal factors
-                    self.save_signal_factor({
-                        'factor_name': 'rsi',
-                        'factor_value': latest_rsi,
-                        'factor_weight': 0.7,
-                        'factor_category': 'technical',
-                        'factor_description': f"RSI(14) value: {latest_rsi:.2f}"
-                    })
-                    
-                    # Add volume factor
-                    volume_change = df['volume'].iloc[-1] / df['volume'].iloc[-5:].mean()
-                    self.save_signal_factor({
+                    {
                         'factor_name': 'volume_change',
-                        'factor_value': volume_change,
+                        'factor_value': tail.volume_ratio,
                         'factor_weight': 0.3,
                         'factor_category': 'technical',
-                        'factor_description': f"Volume change: {volume_change:.2f}x average"
-                    })
+                        'factor_description': f"Volume change: {tail.volume_ratio:.2f}x average"
+                    }
+                ]
         
         except Exception as e:
-            logger.error(f"Error generating RSI signals for {instrument.symbol}: {e}")
+            logger.error(f"Error generating RSI signals for {symbol}: {e}")
     
-    async def generate_macd_signals(self, instrument: Instrument, df: pd.DataFrame):
+    def generate_macd_signals(self, symbol: str, instrument_id: int, tail: TechnicalTail) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
         """Generate signals based on MACD indicator."""
         try:
-            # Calculate MACD
-            exp1 = df['close'].ewm(span=12, adjust=False).mean()
-            exp2 = df['close'].ewm(span=26, adjust=False).mean()
-            macd = exp1 - exp2
-            signal_line = macd.ewm(span=9, adjust=False).mean()
-            histogram = macd - signal_line
+            # Check for MACD crossover
+            if tail.prev_macd < tail.prev_signal_line and tail.macd > tail.signal_line:
+                setup, crossover = 'bullish', 1.0
+            elif tail.prev_macd > tail.prev_signal_line and tail.macd < tail.signal_line:
+                setup, crossover = 'bearish', -1.0
+            else:
+                return
             
-            df['macd'] = macd
-            df['signal_line'] = signal_line
-            df['histogram'] = histogram
+            signal_data = self._build_signal(
+                ('macd', setup),
+                symbol,
+                instrument_id,
+                tail,
+                {
+                    'indicator': 'macd',
+                    'macd_value': tail.macd,
+                    'signal_line_value': tail.signal_line,
+                    'histogram_value': tail.histogram
+                },
+                f"MACD {setup} crossover for {symbol}. MACD: {tail.macd:.4f}, Signal: {tail.signal_line:.4f}"
+            )
             
-            # Check for MACD crossover
-            if df['macd'].iloc[-2] < df['signal_line'].iloc[-2] and df['macd'].iloc[-1] > df['signal_line'].iloc[-1]:
-                # Bullish crossover
-                
-                # Check for options with 7 DTE
-                target_date = datetime.utcnow().date() + timedelta(days=7)
-                min_date = target_date - timedelta(days=2)
-                max_date = target_date + timedelta(days=2)
-                
-                options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'call'
-                ).all()
-                
-                if not options:
-                    logger.warning(f"No suitable options found for {instrument.symbol}")
-                    return
-                
-                # Find ATM option
-                current_price = df['close'].iloc[-1]
-                atm_option = min(options, key=lambda x: abs(x.strike_price - current_price))
-                
-                # Create signal
-                signal_data = {
-                    'instrument_id': instrument.id,
-                    'signal_type': SignalType.LONG_CALL,
-                    'signal_source': SignalSource.TECHNICAL,
-                    'status': SignalStatus.PENDING,
-                    'entry_price': None,  # Will be set when executed
-                    'target_price': current_price * 1.05,  # 5% profit target
-                    'stop_loss': current_price * 0.97,  # 3% stop loss
-                    'confidence_score': 0.7,  # Fixed confidence for MACD crossover
-                    'time_frame': '7d',
-                    'option_id': atm_option.id,
-                    'option_strike': atm_option.strike_price,
-                    'option_expiration': atm_option.expiration_date,
-                    'parameters': {
-                        'indicator': 'macd',
-                        'macd_value': df['macd'].iloc[-1],
-                        'signal_line_value': df['signal_line'].iloc[-1],
-                        'histogram_value': df['histogram'].iloc[-1]
-                    },
-                    'notes': f"MACD bullish crossover for {instrument.symbol}. MACD: {df['macd'].iloc[-1]:.4f}, Signal: {df['signal_line'].iloc[-1]:.4f}"
-                }
-                
-                # Save signal
-                signal = self.save_signal(signal_data)
-                
-                if signal:
-                    # Save signal factors
-                    self.save_signal_factor({
+            if signal_data:
+                return signal_data, [
+                    {
                         'factor_name': 'macd_crossover',
-                        'factor_value': 1.0,  # Bullish crossover
+                        'factor_value': crossover,
                         'factor_weight': 0.6,
                         'factor_category': 'technical',
-                        'factor_description': f"MACD bullish crossover. MACD: {df['macd'].iloc[-1]:.4f}, Signal: {df['signal_line'].iloc[-1]:.4f}"
-                    })
-                    
-                    # Add histogram factor
-                    self.save_signal_factor({
-                        'factor_name': 'macd_histogram',
-                        'factor_value': df['histogram'].iloc[-1],
-                        'factor_weight': 0.4,
-                        'factor_category': 'technical',
-                        'factor_description': f"MACD histogram: {df['histogram'].iloc[-1]:.4f}"
-                    })
-            
-            elif df['macd'].iloc[-2] > df['signal_line'].iloc[-2] and df['macd'].iloc[-1] < df['signal_line'].iloc[-1]:
-                # Bearish crossover
-                
-                # Check for options with 7 DTE
-                target_date = datetime.utcnow().date() + timedelta(days=7)
-                min_date = target_date - timedelta(days=2)
-                max_date = target_date + timedelta(days=2)
-                
-                options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'put'
-                ).all()
-                
-                if not options:
-                    logger.warning(f"No suitable options found for {instrument.symbol}")
-                    return
-                
-                # Find ATM option
-                current_price = df['close'].iloc[-1]
-                atm_option = min(options, key=lambda x: abs(x.strike_price - current_price))
-                
-                # Create signal
-                signal_data = {
-                    'instrument_id': instrument.id,
-                    'signal_type': SignalType.LONG_PUT,
-                    'signal_source': SignalSource.TECHNICAL,
-                    'status': SignalStatus.PENDING,
-                    'entry_price': None,  # Will be set when executed
-                    'target_price': current_price * 0.95,  # 5% profit target
-                    'stop_loss': current_price * 1.03,  # 3% stop loss
-                    'confidence_score': 0.7,  # Fixed confidence for MACD crossover
-                    'time_frame': '7d',
-                    'option_id': atm_option.id,
-                    'option_strike': atm_option.strike_price,
-                    'option_expiration': atm_option.expiration_date,
-                    'parameters': {
-                        'indicator': 'macd',
-                        'macd_value': df['macd'].iloc[-1],
-                        'signal_line_value': df['signal_line'].iloc[-1],
-                        'histogram_value': df['histogram'].iloc[-1]
+                        'factor_description': f"MACD {setup} crossover. MACD: {tail.macd:.4f}, Signal: {tail.signal_line:.4f}"
                     },
-                    'notes': f"MACD bearish crossover for {instrument.symbol}. MACD: {df['macd'].iloc[-1]:.4f}, Signal: {df['signal_line'].iloc[-1]:.4f}"
-                }
-                
-                # Save signal
-                signal = self.save_signal(signal_data)
-                
-                if signal:
-                    # Save signal factors
-                    self.save_signal_factor({
-                        'factor_name': 'macd_crossover',
-                        'factor_value': -1.0,  # Bearish crossover
-                        'factor_weight': 0.6,
-                        'factor_category': 'technical',
-                        'factor_description': f"MACD bearish crossover. MACD: {df['macd'].iloc[-1]:.4f}, Signal: {df['signal_line'].iloc[-1]:.4f}"
-                    })
-                    
-                    # Add histogram factor
-                    self.save_signal_factor({
+                    {
                         'factor_name': 'macd_histogram',
-                        'factor_value': df['histogram'].iloc[-1],
+                        'factor_value': tail.histogram,
                         'factor_weight': 0.4,
                         'factor_category': 'technical',
-                        'factor_description': f"MACD histogram: {df['histogram'].iloc[-1]:.4f}"
-                    })
+                        'factor_description': f"MACD histogram: {tail.histogram:.4f}"
+                    }
+                ]
         
         except Exception as e:
-            logger.error(f"Error generating MACD signals for {instrument.symbol}: {e}")
+            logger.error(f"Error generating MACD signals for {symbol}: {e}")
     
-    async def generate_bollinger_signals(self, instrument: Instrument, df: pd.DataFrame):
+    def generate_bollinger_signals(self, symbol: str, instrument_id: int, tail: TechnicalTail) -> Optional[Tuple[Dict[str, Any], List[Dict[str, Any]]]]:
         """Generate signals based on Bollinger Bands."""
         try:
-            # Calculate Bollinger Bands
-            window = 20
-            df['sma'] = df['close'].rolling(window=window).mean()
-            df['std'] = df['close'].rolling(window=window).std()
-            df['upper_band'] = df['sma'] + 2 * df['std']
-            df['lower_band'] = df['sma'] - 2 * df['std']
-            
-            # Check for price crossing below lower band
-            if df['close'].iloc[-2] > df['lower_band'].iloc[-2] and df['close'].iloc[-1] < df['lower_band'].iloc[-1]:
-                # Potential bounce (bullish)
-                
-                # Check for options with 7 DTE
-                target_date = datetime.utcnow().date() + timedelta(days=7)
-                min_date = target_date - timedelta(days=2)
-                max_date = target_date + timedelta(days=2)
-                
-                options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'call'
-                ).all()
-                
-                if not options:
-                    logger.warning(f"No suitable options found for {instrument.symbol}")
-                    return
-                
-                # Find ATM option
-                current_price = df['close'].iloc[-1]
-                atm_option = min(options, key=lambda x: abs(x.strike_price - current_price))
-                
-                # Create signal
-                signal_data = {
-                    'instrument_id': instrument.id,
-                    'signal_type': SignalType.LONG_CALL,
-                    'signal_source': SignalSource.TECHNICAL,
-                    'status': SignalStatus.PENDING,
-                    'entry_price': None,  # Will be set when executed
-                    'target_price': df['sma'].iloc[-1],  # Target the middle band (SMA)
-                    'stop_loss': current_price * 0.97,  # 3% stop loss
-                    'confidence_score': 0.65,  # Fixed confidence for Bollinger Band signal
-                    'time_frame': '7d',
-                    'option_id': atm_option.id,
-                    'option_strike': atm_option.strike_price,
-                    'option_expiration': atm_option.expiration_date,
-                    'parameters': {
-                        'indicator': 'bollinger_bands',
-                        'sma_value': df['sma'].iloc[-1],
-                        'upper_band_value': df['upper_band'].iloc[-1],
-                        'lower_band_value': df['lower_band'].iloc[-1]
-                    },
-                    'notes': f"Bollinger Band lower band break for {instrument.symbol}. Price: {current_price:.2f}, Lower Band: {df['lower_band'].iloc[-1]:.2f}"
-                }
-                
-                # Save signal
-                signal = self.save_signal(signal_data)
-                
-                if signal:
-                    # Save signal factors
-                    self.save_signal_factor({
-                        'factor_name': 'bollinger_band_position',
-                        'factor_value': (current_price - df['lower_band'].iloc[-1]) / (df['upper_band'].iloc[-1] - df['lower_band'].iloc[-1]),
-                        'factor_weight': 0.7,
-                        'factor_category': 'technical',
-                        'factor_description': f"Position within Bollinger Bands (0 = lower band, 1 = upper band)"
-                    })
-                    
-                    # Add bandwidth factor
-                    bandwidth = (df['upper_band'].iloc[-1] - df['lower_band'].iloc[-1]) / df['sma'].iloc[-1]
-                    self.save_signal_factor({
-                        'factor_name': 'bollinger_bandwidth',
-                        'factor_value': bandwidth,
-                        'factor_weight': 0.3,
-                        'factor_category': 'technical',
-                        'factor_description': f"Bollinger Bandwidth: {bandwidth:.4f}"
-                    })
+            # Check for price crossing below lower band (potential bounce)
+            # or above upper band (potential reversal)
+            if tail.prev_close > tail.prev_lower_band and tail.close < tail.lower_band:
+                setup, band_name, band_value = 'lower_break', 'Lower', tail.lower_band
+            elif tail.prev_close < tail.prev_upper_band and tail.close > tail.upper_band:
+                setup, band_name, band_value = 'upper_break', 'Upper', tail.upper_band
+            else:
+                return
             
-            # Check for price crossing above upper band
-            elif df['close'].iloc[-2] < df['upper_band'].iloc[-2] and df['close'].iloc[-1] > df['upper_band'].iloc[-1]:
-                # Potential reversal (bearish)
-                
-                # Check for options with 7 DTE
-                target_date = datetime.utcnow().date() + timedelta(days=7)
-                min_date = target_date - timedelta(days=2)
-                max_date = target_date + timedelta(days=2)
-                
-                options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'put'
-                ).all()
-                
-                if not options:
-                    logger.warning(f"No suitable options found for {instrument.symbol}")
-                    return
-                
-                # Find ATM option
-                current_price = df['close'].iloc[-1]
-                atm_option = min(options, key=lambda x: abs(x.strike_price - current_price))
-                
-                # Create signal
-                signal_data = {
-                    'instrument_id': instrument.id,
-                    'signal_type': SignalType.LONG_PUT,
-                    'signal_source': SignalSource.TECHNICAL,
-                    'status': SignalStatus.PENDING,
-                    'entry_price': None,  # Will be set when executed
-                    'target_price': df['sma'].iloc[-1],  # Target the middle band (SMA)
-                    'stop_loss': current_price * 1.03,  # 3% stop loss
-                    'confidence_score': 0.65,  # Fixed confidence for Bollinger Band signal
-                    'time_frame': '7d',
-                    'option_id': atm_option.id,
-                    'option_strike': atm_option.strike_price,
-                    'option_expiration': atm_option.expiration_date,
-                    'parameters': {
-                        'indicator': 'bollinger_bands',
-                        'sma_value': df['sma'].iloc[-1],
-                        'upper_band_value': df['upper_band'].iloc[-1],
-                        'lower_band_value': df['lower_band'].iloc[-1]
-                    },
-                    'notes': f"Bollinger Band upper band break for {instrument.symbol}. Price: {current_price:.2f}, Upper Band: {df['upper_band'].iloc[-1]:.2f}"
-                }
-                
-                # Save signal
-                signal = self.save_signal(signal_data)
-                
-                if signal:
-                    # Save signal factors
-                    self.save_signal_factor({
+            signal_data = self._build_signal(
+                ('bollinger', setup),
+                symbol,
+                instrument_id,
+                tail,
+                {
+                    'indicator': 'bollinger_bands',
+                    'sma_value': tail.sma,
+                    'upper_band_value': tail.upper_band,
+                    'lower_band_value': tail.lower_band
+                },
+                f"Bollinger Band {band_name.lower()} band break for {symbol}. Price: {tail.close:.2f}, {band_name} Band: {band_value:.2f}"
+            )
+            
+            if signal_data:
+                bandwidth = (tail.upper_band - tail.lower_band) / tail.sma
+                return signal_data, [
+                    {
                         'factor_name': 'bollinger_band_position',
-                        'factor_value': (current_price - df['lower_band'].iloc[-1]) / (df['upper_band'].iloc[-1] - df['lower_band'].iloc[-1]),
+                        'factor_value': (tail.close - tail.lower_band) / (tail.upper_band - tail.lower_band),
                         'factor_weight': 0.7,
                         'factor_category': 'technical',
                         'factor_description': f"Position within Bollinger Bands (0 = lower band, 1 = upper band)"
-                    })
-                    
-                    # Add bandwidth factor
-                    bandwidth = (df['upper_band'].iloc[-1] - df['lower_band'].iloc[-1]) / df['sma'].iloc[-1]
-                    self.save_signal_factor({
+                    },
+                    {
                         'factor_name': 'bollinger_bandwidth',
                         'factor_value': bandwidth,
                         'factor_weight': 0.3,
                         'factor_category': 'technical',
                         'factor_description': f"Bollinger Bandwidth: {bandwidth:.4f}"
-                    })
+                    }
+                ]
         
         except Exception as e:
-            logger.error(f"Error generating Bollinger Band signals for {instrument.symbol}: {e}")
+            logger.error(f"Error generating Bollinger Band signals for {symbol}: {e}")
 
 class FundamentalSignalGenerator(SignalGenerator):
     """Generate signals based on fundamental analysis."""
     
-    async def generate_signals(self):
+    async def generate_signals(self, now: Optional[datetime] = None):
         """Generate fundamental signals for all Mag7 stocks."""
-        for symbol in settings.MAG7_SYMBOLS:
-            try:
-                # Get instrument
-                instrument = self.db.query(Instrument).filter(Instrument.symbol == symbol).first()
-                if not instrument:
-                    logger.warning(f"Instrument {symbol} not found in database")
-                    continue
-                
-                # Generate signals
-                await self.generate_earnings_signals(instrument)
-                await self.generate_valuation_signals(instrument)
-                
-            except Exception as e:
-                logger.error(f"Error generating fundamental signals for {symbol}: {e}")
+        self._refresh_clock(now)
+        self._load_instruments(settings.MAG7_SYMBOLS)
+        
+        await self._gather_symbols(settings.MAG7_SYMBOLS, FundamentalSignalGenerator._generate_for_symbol)
+    
+    async def _generate_for_symbol(self, symbol: str):
+        """Generate fundamental signals for one symbol."""
+        try:
+            # Get instrument
+            instrument = self._get_instrument(symbol)
+            if not instrument:
+                logger.warning(f"Instrument {symbol} not found in database")
+                return
+            
+            # Generate signals
+            await self.generate_earnings_signals(instrument)
+            await self.generate_valuation_signals(instrument)
+            
+        except Exception as e:
+            logger.error(f"Error generating fundamental signals for {symbol}: {e}")
     
+    @ttl_cache(seconds=60, freshness=lambda self, instrument: json.dumps(instrument.earnings_schedule, sort_keys=True))
     async def generate_earnings_signals(self, instrument: Instrument):
         """Generate signals based on upcoming earnings."""
         try:
@@ -616,370 +879,242 @@ class FundamentalSignalGenerator(SignalGenerator):
             # Parse next earnings date
             next_earnings_date = datetime.fromisoformat(instrument.earnings_schedule.get("next_date"))
             
-            # Check if earnings are within the next 14 days
-            days_to_earnings = (next_earnings_date.date() - datetime.utcnow().date()).days
+            # Only earnings 3 to 14 days out are traded
+            days_to_earnings = (next_earnings_date.date() - self._now.date()).days
+            if not 3 <= days_to_earnings <= 14:
+                return
             
-            if 3 <= days_to_earnings <= 14:
-                # Get historical earnings data
-                earnings_data = self.db.query(EarningsData).filter(
+            # Get surprise percentages for the last 8 earnings
+            earnings_surprises = self.db.execute(
+                select(EarningsData.surprise_percentage).where(
                     EarningsData.instrument_id == instrument.id
-                ).order_by(EarningsData.earnings_date.desc()).limit(8).all()
-                
-                if not earnings_data:
-                    logger.warning(f"No historical earnings data found for {instrument.symbol}")
-                    return
-                
-                # Calculate average surprise percentage
-                surprise_percentages = [e.surprise_percentage for e in earnings_data if e.surprise_percentage is not None]
-                avg_surprise = sum(surprise_percentages) / len(surprise_percentages) if surprise_percentages else 0
-                
-                # Count positive surprises
-                positive_surprises = sum(1 for sp in surprise_percentages if sp > 0)
-                positive_surprise_ratio = positive_surprises / len(surprise_percentages) if surprise_percentages else 0
-                
-                # Determine signal direction based on historical earnings performance
-                if positive_surprise_ratio >= 0.75 and avg_surprise > 5:
-                    # Strong history of positive surprises, bullish signal
-                    
-                    # Check for options with expiration after earnings
-                    min_expiration = next_earnings_date + timedelta(days=1)
-                    max_expiration = next_earnings_date + timedelta(days=10)
-                    
-                    options = self.db.query(Option).filter(
-                        Option.instrument_id == instrument.id,
-                        Option.expiration_date >= min_expiration,
-                        Option.expiration_date <= max_expiration,
-                        Option.option_type == 'call'
-                    ).all()
-                    
-                    if not options:
-                        logger.warning(f"No suitable options found for {instrument.symbol}")
-                        return
-                    
-                    # Get current price
-                    current_price = self.db.query(StockPrice).filter(
-                        StockPrice.instrument_id == instrument.id
-                    ).order_by(StockPrice.timestamp.desc()).first().close
-                    
-                    # Find ATM option
-                    atm_option = min(options, key=lambda x: abs(x.strike_price - current_price))
-                    
-                    # Create signal
-                    signal_data = {
-                        'instrument_id': instrument.id,
-                        'signal_type': SignalType.LONG_CALL,
-                        'signal_source': SignalSource.EARNINGS,
-                        'status': SignalStatus.PENDING,
-                        'entry_price': None,  # Will be set when executed
-                        'target_price': current_price * 1.08,  # 8% profit target
-                        'stop_loss': current_price * 0.95,  # 5% stop loss
-                        'confidence_score': 0.7 * positive_surprise_ratio + 0.3 * min(1.0, avg_surprise / 10),
-                        'time_frame': f"{days_to_earnings}d",
-                        'option_id': atm_option.id,
-                        'option_strike': atm_option.strike_price,
-                        'option_expiration': atm_option.expiration_date,
-                        'earnings_impact': 0.9,  # High impact from earnings
-                        'parameters': {
-                            'days_to_earnings': days_to_earnings,
-                            'avg_surprise_percentage': avg_surprise,
-                            'positive_surprise_ratio': positive_surprise_ratio
-                        },
-                        'notes': f"Earnings play for {instrument.symbol}. Earnings date: {next_earnings_date.strftime('%Y-%m-%d')}. Historical positive surprise ratio: {positive_surprise_ratio:.2f}"
-                    }
-                    
-                    # Save signal
-                    signal = self.save_signal(signal_data)
-                    
-                    if signal:
-                        # Save signal factors
-                        self.save_signal_factor({
-                            'factor_name': 'earnings_surprise_history',
-                            'factor_value': avg_surprise,
-                            'factor_weight': 0.5,
-                            'factor_category': 'fundamental',
-                            'factor_description': f"Average earnings surprise: {avg_surprise:.2f}%"
-                        })
-                        
-                        self.save_signal_factor({
-                            'factor_name': 'positive_surprise_ratio',
-                            'factor_value': positive_surprise_ratio,
-                            'factor_weight': 0.3,
-                            'factor_category': 'fundamental',
-                            'factor_description': f"Positive surprise ratio: {positive_surprise_ratio:.2f}"
-                        })
-                        
-                        self.save_signal_factor({
-                            'factor_name': 'days_to_earnings',
-                            'factor_value': days_to_earnings,
-                            'factor_weight': 0.2,
-                            'factor_category': 'fundamental',
-                            'factor_description': f"Days to earnings: {days_to_earnings}"
-                        })
-                
-                elif positive_surprise_ratio <= 0.25 or avg_surprise < -5:
-                    # History of negative surprises, bearish signal
-                    
-                    # Check for options with expiration after earnings
-                    min_expiration = next_earnings_date + timedelta(days=1)
-                    max_expiration = next_earnings_date + timedelta(days=10)
-                    
-                    options = self.db.query(Option).filter(
-                        Option.instrument_id == instrument.id,
-                        Option.expiration_date >= min_expiration,
-                        Option.expiration_date <= max_expiration,
-                        Option.option_type == 'put'
-                    ).all()
-                    
-                    if not options:
-                        logger.warning(f"No suitable options found for {instrument.symbol}")
-                        return
-                    
-                    # Get current price
-                    current_price = self.db.query(StockPrice).filter(
-                        StockPrice.instrument_id == instrument.id
-                    ).order_by(StockPrice.timestamp.desc()).first().close
-                    
-                    # Find ATM option
-                    atm_option = min(options, key=lambda x: abs(x.strike_price - current_price))
-                    
-                    # Create signal
-                    signal_data = {
-                        'instrument_id': instrument.id,
-                        'signal_type': SignalType.LONG_PUT,
-                        'signal_source': SignalSource.EARNINGS,
-                        'status': SignalStatus.PENDING,
-                        'entry_price': None,  # Will be set when executed
-                        'target_price': current_price * 0.92,  # 8% profit target
-                        'stop_loss': current_price * 1.05,  # 5% stop loss
-                        'confidence_score': 0.7 * (1 - positive_surprise_ratio) + 0.3 * min(1.0, abs(avg_surprise) / 10),
-                        'time_frame': f"{days_to_earnings}d",
-                        'option_id': atm_option.id,
-                        'option_strike': atm_option.strike_price,
-                        'option_expiration': atm_option.expiration_date,
-                        'earnings_impact': 0.9,  # High impact from earnings
-                        'parameters': {
-                            'days_to_earnings': days_to_earnings,
-                            'avg_surprise_percentage': avg_surprise,
-                            'positive_surprise_ratio': positive_surprise_ratio
-                        },
-                        'notes': f"Earnings play for {instrument.symbol}. Earnings date: {next_earnings_date.strftime('%Y-%m-%d')}. Historical positive surprise ratio: {positive_surprise_ratio:.2f}"
-                    }
-                    
-                    # Save signal
-                    signal = self.save_signal(signal_data)
-                    
-                    if signal:
-                        # Save signal factors
-                        self.save_signal_factor({
-                            'factor_name': 'earnings_surprise_history',
-                            'factor_value': avg_surprise,
-                            'factor_weight': 0.5,
-                            'factor_category': 'fundamental',
-                            'factor_description': f"Average earnings surprise: {avg_surprise:.2f}%"
-                        })
-                        
-                        self.save_signal_factor({
-                            'factor_name': 'positive_surprise_ratio',
-                            'factor_value': positive_surprise_ratio,
-                            'factor_weight': 0.3,
-                            'factor_category': 'fundamental',
-                            'factor_description': f"Positive surprise ratio: {positive_surprise_ratio:.2f}"
-                        })
-                        
-                        self.save_signal_factor({
-                            'factor_name': 'days_to_earnings',
-                            'factor_value': days_to_earnings,
-                            'factor_weight': 0.2,
-                            'factor_category': 'fundamental',
-                            'factor_description': f"Days to earnings: {days_to_earnings}"
-                        })
+                ).order_by(EarningsData.earnings_date.desc()).limit(8)
+            ).scalars().all()
+            
+            if not earnings_surprises:
+                logger.warning(f"No historical earnings data found for {instrument.symbol}")
+                return
+            
+            # Calculate average surprise percentage
+            surprise_percentages = [sp for sp in earnings_surprises if sp is not None]
+            avg_surprise = sum(surprise_percentages) / len(surprise_percentages) if surprise_percentages else 0
+            
+            # Count positive surprises
+            positive_surprises = sum(1 for sp in surprise_percentages if sp > 0)
+            positive_surprise_ratio = positive_surprises / len(surprise_percentages) if surprise_percentages else 0
+            
+            # Determine signal direction based on historical earnings performance
+            if positive_surprise_ratio >= 0.75 and avg_surprise > 5:
+                # Strong history of positive surprises, bullish signal
+                signal_type, option_type = SignalType.LONG_CALL, 'call'
+                target_ratio, stop_ratio = 1.08, 0.95  # 8% profit target, 5% stop loss
+                confidence_score = 0.7 * positive_surprise_ratio + 0.3 * min(1.0, avg_surprise / 10)
+            elif positive_surprise_ratio <= 0.25 or avg_surprise < -5:
+                # History of negative surprises, bearish signal
+                signal_type, option_type = SignalType.LONG_PUT, 'put'
+                target_ratio, stop_ratio = 0.92, 1.05  # 8% profit target, 5% stop loss
+                confidence_score = 0.7 * (1 - positive_surprise_ratio) + 0.3 * min(1.0, abs(avg_surprise) / 10)
+            else:
+                return
+            
+            # Get current price
+            current_price = self._get_latest_close(instrument.id)
+            if current_price is None:
+                logger.warning(f"No price data found for {instrument.symbol}")
+                return
+            
+            # Find ATM option expiring within 10 days after earnings
+            atm_option = self._query_atm_option(
+                instrument.id,
+                option_type,
+                current_price,
+                next_earnings_date + timedelta(days=1),
+                next_earnings_date + timedelta(days=10)
+            )
+            
+            if not atm_option:
+                logger.warning(f"No suitable options found for {instrument.symbol}")
+                return
+            
+            # Create signal
+            signal_data = {
+                'instrument_id': instrument.id,
+                'signal_type': signal_type,
+                'signal_source': SignalSource.EARNINGS,
+                'status': SignalStatus.PENDING,
+                'entry_price': None,  # Will be set when executed
+                'target_price': current_price * target_ratio,
+                'stop_loss': current_price * stop_ratio,
+                'confidence_score': confidence_score,
+                'time_frame': f"{days_to_earnings}d",
+                'option_id': atm_option.id,
+                'option_strike': atm_option.strike_price,
+                'option_expiration': atm_option.expiration_date,
+                'earnings_impact': 0.9,  # High impact from earnings
+                'parameters': {
+                    'days_to_earnings': days_to_earnings,
+                    'avg_surprise_percentage': avg_surprise,
+                    'positive_surprise_ratio': positive_surprise_ratio
+                },
+                'notes': ('earnings', instrument.symbol, next_earnings_date.date(), positive_surprise_ratio)
+            }
+            
+            # Save signal and its factors; a failed save is retried on the next call
+            signal = self.save_signal(signal_data, [
+                {
+                    'factor_name': 'earnings_surprise_history',
+                    'factor_value': avg_surprise,
+                    'factor_weight': 0.5,
+                    'factor_category': 'fundamental',
+                    'factor_description': f"Average earnings surprise: {avg_surprise:.2f}%"
+                },
+                {
+                    'factor_name': 'positive_surprise_ratio',
+                    'factor_value': positive_surprise_ratio,
+                    'factor_weight': 0.3,
+                    'factor_category': 'fundamental',
+                    'factor_description': f"Positive surprise ratio: {positive_surprise_ratio:.2f}"
+                },
+                {
+                    'factor_name': 'days_to_earnings',
+                    'factor_value': days_to_earnings,
+                    'factor_weight': 0.2,
+                    'factor_category': 'fundamental',
+                    'factor_description': f"Days to earnings: {days_to_earnings}"
+                }
+            ])
+            if signal is None:
+                return False
         
         except Exception as e:
             logger.error(f"Error generating earnings signals for {instrument.symbol}: {e}")
+            return False
     
+    @ttl_cache(seconds=60, freshness=_latest_metric_date)
     async def generate_valuation_signals(self, instrument: Instrument):
         """Generate signals based on valuation metrics."""
         try:
-            # Get latest financial metrics
-            pe_ratio = self.db.query(FinancialMetric).filter(
-                FinancialMetric.instrument_id == instrument.id,
-                FinancialMetric.metric_type == 'pe_ratio'
-            ).order_by(FinancialMetric.date.desc()).first()
-            
-            peg_ratio = self.db.query(FinancialMetric).filter(
-                FinancialMetric.instrument_id == instrument.id,
-                FinancialMetric.metric_type == 'peg_ratio'
-            ).order_by(FinancialMetric.date.desc()).first()
-            
-            if not pe_ratio or not peg_ratio:
+            # Get the latest PE and PEG ratios in one DISTINCT ON (metric_type) query
+            metrics = dict(
+                self.db.execute(
+                    select(FinancialMetric.metric_type, FinancialMetric.value).where(
+                        FinancialMetric.instrument_id == instrument.id,
+                        FinancialMetric.metric_type.in_(['pe_ratio', 'peg_ratio'])
+                    ).order_by(
+                        FinancialMetric.metric_type,
+                        FinancialMetric.date.desc()
+                    ).distinct(FinancialMetric.metric_type)
+                ).all()
+            )
+            pe_ratio = metrics.get('pe_ratio')
+            peg_ratio = metrics.get('peg_ratio')
+            
+            if pe_ratio is None or peg_ratio is None:
                 logger.warning(f"Missing valuation metrics for {instrument.symbol}")
                 return
             
+            # Find the first valuation rule that matches
+            for matches, option_type, signal_type, target_ratio, stop_ratio in VALUATION_RULES:
+                if matches(pe_ratio, peg_ratio):
+                    break
+            else:
+                return
+            
             # Get current price
-            current_price = self.db.query(StockPrice).filter(
-                StockPrice.instrument_id == instrument.id
-            ).order_by(StockPrice.timestamp.desc()).first().close
+            current_price = self._get_latest_close(instrument.id)
+            if current_price is None:
+                logger.warning(f"No price data found for {instrument.symbol}")
+                return
             
-            # Check for undervaluation
-            if pe_ratio.value < 15 and peg_ratio.value < 1.0:
-                # Undervalued, bullish signal
-                
-                # Check for options with 7 DTE
-                target_date = datetime.utcnow().date() + timedelta(days=7)
-                min_date = target_date - timedelta(days=2)
-                max_date = target_date + timedelta(days=2)
-                
-                options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'call'
-                ).all()
-                
-                if not options:
-                    logger.warning(f"No suitable options found for {instrument.symbol}")
-                    return
-                
-                # Find ATM option
-                atm_option = min(options, key=lambda x: abs(x.strike_price - current_price))
-                
-                # Create signal
-                signal_data = {
-                    'instrument_id': instrument.id,
-                    'signal_type': SignalType.LONG_CALL,
-                    'signal_source': SignalSource.FUNDAMENTAL,
-                    'status': SignalStatus.PENDING,
-                    'entry_price': None,  # Will be set when executed
-                    'target_price': current_price * 1.05,  # 5% profit target
-                    'stop_loss': current_price * 0.97,  # 3% stop loss
-                    'confidence_score': 0.6,  # Moderate confidence for valuation signals
-                    'time_frame': '7d',
-                    'option_id': atm_option.id,
-                    'option_strike': atm_option.strike_price,
-                    'option_expiration': atm_option.expiration_date,
-                    'valuation_impact': 0.8,  # High impact from valuation
-                    'parameters': {
-                        'pe_ratio': pe_ratio.value,
-                        'peg_ratio': peg_ratio.value
-                    },
-                    'notes': f"Valuation signal for {instrument.symbol}. PE Ratio: {pe_ratio.value:.2f}, PEG Ratio: {peg_ratio.value:.2f}"
-                }
-                
-                # Save signal
-                signal = self.save_signal(signal_data)
-                
-                if signal:
-                    # Save signal factors
-                    self.save_signal_factor({
-                        'factor_name': 'pe_ratio',
-                        'factor_value': pe_ratio.value,
-                        'factor_weight': 0.5,
-                        'factor_category': 'fundamental',
-                        'factor_description': f"PE Ratio: {pe_ratio.value:.2f}"
-                    })
-                    
-                    self.save_signal_factor({
-                        'factor_name': 'peg_ratio',
-                        'factor_value': peg_ratio.value,
-                        'factor_weight': 0.5,
-                        'factor_category': 'fundamental',
-                        'factor_description': f"PEG Ratio: {peg_ratio.value:.2f}"
-                    })
-            
-            # Check for overvaluation
-            elif pe_ratio.value > 30 and peg_ratio.value > 2.0:
-                # Overvalued, bearish signal
-                
-                # Check for options with 7 DTE
-                target_date = datetime.utcnow().date() + timedelta(days=7)
-                min_date = target_date - timedelta(days=2)
-                max_date = target_date + timedelta(days=2)
-                
-                options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'put'
-                ).all()
-                
-                if not options:
-                    logger.warning(f"No suitable options found for {instrument.symbol}")
-                    return
-                
-                # Find ATM option
-                atm_option = min(options, key=lambda x: abs(x.strike_price - current_price))
-                
-                # Create signal
-                signal_data = {
-                    'instrument_id': instrument.id,
-                    'signal_type': SignalType.LONG_PUT,
-                    'signal_source': SignalSource.FUNDAMENTAL,
-                    'status': SignalStatus.PENDING,
-                    'entry_price': None,  # Will be set when executed
-                    'target_price': current_price * 0.95,  # 5% profit target
-                    'stop_loss': current_price * 1.03,  # 3% stop loss
-                    'confidence_score': 0.6,  # Moderate confidence for valuation signals
-                    'time_frame': '7d',
-                    'option_id': atm_option.id,
-                    'option_strike': atm_option.strike_price,
-                    'option_expiration': atm_option.expiration_date,
-                    'valuation_impact': 0.8,  # High impact from valuation
-                    'parameters': {
-                        'pe_ratio': pe_ratio.value,
-                        'peg_ratio': peg_ratio.value
-                    },
-                    'notes': f"Valuation signal for {instrument.symbol}. PE Ratio: {pe_ratio.value:.2f}, PEG Ratio: {peg_ratio.value:.2f}"
+            # Find ATM option
+            atm_option = self._query_atm_option(instrument.id, option_type, current_price)
+            
+            if not atm_option:
+                logger.warning(f"No suitable options found for {instrument.symbol}")
+                return
+            
+            # Create signal
+            signal_data = {
+                'instrument_id': instrument.id,
+                'signal_type': signal_type,
+                'signal_source': SignalSource.FUNDAMENTAL,
+                'status': SignalStatus.PENDING,
+                'entry_price': None,  # Will be set when executed
+                'target_price': current_price * target_ratio,
+                'stop_loss': current_price * stop_ratio,
+                'confidence_score': 0.6,  # Moderate confidence for valuation signals
+                'time_frame': '7d',
+                'option_id': atm_option.id,
+                'option_strike': atm_option.strike_price,
+                'option_expiration': atm_option.expiration_date,
+                'valuation_impact': 0.8,  # High impact from valuation
+                'parameters': {
+                    'pe_ratio': pe_ratio,
+                    'peg_ratio': peg_ratio
+                },
+                'notes': ('valuation', instrument.symbol, pe_ratio, peg_ratio)
+            }
+            
+            # Save signal and its factors; a failed save is retried on the next call
+            signal = self.save_signal(signal_data, [
+                {
+                    'factor_name': 'pe_ratio',
+                    'factor_value': pe_ratio,
+                    'factor_weight': 0.5,
+                    'factor_category': 'fundamental',
+                    'factor_description': f"PE Ratio: {pe_ratio:.2f}"
+                },
+                {
+                    'factor_name': 'peg_ratio',
+                    'factor_value': peg_ratio,
+                    'factor_weight': 0.5,
+                    'factor_category': 'fundamental',
+                    'factor_description': f"PEG Ratio: {peg_ratio:.2f}"
                 }
-                
-                # Save signal
-                signal = self.save_signal(signal_data)
-                
-                if signal:
-                    # Save signal factors
-                    self.save_signal_factor({
-                        'factor_name': 'pe_ratio',
-                        'factor_value': pe_ratio.value,
-                        'factor_weight': 0.5,
-                        'factor_category': 'fundamental',
-                        'factor_description': f"PE Ratio: {pe_ratio.value:.2f}"
-                    })
-                    
-                    self.save_signal_factor({
-                        'factor_name': 'peg_ratio',
-                        'factor_value': peg_ratio.value,
-                        'factor_weight': 0.5,
-                        'factor_category': 'fundamental',
-                        'factor_description': f"PEG Ratio: {peg_ratio.value:.2f}"
-                    })
+            ])
+            if signal is None:
+                return False
         
         except Exception as e:
             logger.error(f"Error generating valuation signals for {instrument.symbol}: {e}")
+            return False
 
 class VolatilitySignalGenerator(SignalGenerator):
     """Generate signals based on volatility analysis."""
     
-    async def generate_signals(self):
+    async def generate_signals(self, now: Optional[datetime] = None):
         """Generate volatility signals for all Mag7 stocks."""
-        for symbol in settings.MAG7_SYMBOLS:
-            try:
-                # Get instrument
-                instrument = self.db.query(Instrument).filter(Instrument.symbol == symbol).first()
-                if not instrument:
-                    logger.warning(f"Instrument {symbol} not found in database")
-                    continue
-                
-                # Generate signals
-                await self.generate_iv_percentile_signals(instrument)
-                await self.generate_iv_skew_signals(instrument)
-                
-            except Exception as e:
-                logger.error(f"Error generating volatility signals for {symbol}: {e}")
+        self._refresh_clock(now)
+        self._load_instruments(settings.MAG7_SYMBOLS)
+        
+        await self._gather_symbols(settings.MAG7_SYMBOLS, VolatilitySignalGenerator._generate_for_symbol)
     
+    async def _generate_for_symbol(self, symbol: str):
+        """Generate volatility signals for one symbol."""
+        try:
+            # Get instrument
+            instrument = self._get_instrument(symbol)
+            if not instrument:
+                logger.warning(f"Instrument {symbol} not found in database")
+                return
+            
+            # Generate signals
+            await self.generate_iv_percentile_signals(instrument)
+            await self.generate_iv_skew_signals(instrument)
+            
+        except Exception as e:
+            logger.error(f"Error generating volatility signals for {symbol}: {e}")
+    
+    @ttl_cache(seconds=60, freshness=_latest_volatility_date)
     async def generate_iv_percentile_signals(self, instrument: Instrument):
         """Generate signals based on implied volatility percentile."""
         try:
             # Get volatility data
-            volatility_data = self.db.query(VolatilityData).filter(
+            volatility_data = self.db.query(
+                VolatilityData.iv_percentile,
+                VolatilityData.iv_rank,
+                VolatilityData.implied_volatility_avg
+            ).filter(
                 VolatilityData.instrument_id == instrument.id
             ).order_by(VolatilityData.date.desc()).first()
             
@@ -987,172 +1122,78 @@ class VolatilitySignalGenerator(SignalGenerator):
                 logger.warning(f"No volatility data found for {instrument.symbol}")
                 return
             
-            # Check for low IV percentile
-            if volatility_data.iv_percentile < 20:
-                # Low IV, potential for long volatility strategies
-                
-                # Check for options with 7 DTE
-                target_date = datetime.utcnow().date() + timedelta(days=7)
-                min_date = target_date - timedelta(days=2)
-                max_date = target_date + timedelta(days=2)
-                
-                # Get current price
-                current_price = self.db.query(StockPrice).filter(
-                    StockPrice.instrument_id == instrument.id
-                ).order_by(StockPrice.timestamp.desc()).first().close
-                
-                # Find call options
-                call_options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'call'
-                ).all()
-                
-                # Find put options
-                put_options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'put'
-                ).all()
-                
-                if not call_options or not put_options:
-                    logger.warning(f"No suitable options found for {instrument.symbol}")
-                    return
-                
-                # Find ATM options
-                atm_call = min(call_options, key=lambda x: abs(x.strike_price - current_price))
-                atm_put = min(put_options, key=lambda x: abs(x.strike_price - current_price))
-                
-                # Create signal for long straddle
-                signal_data = {
-                    'instrument_id': instrument.id,
-                    'signal_type': SignalType.LONG_CALL,  # Simplified to long call for now
-                    'signal_source': SignalSource.VOLATILITY,
-                    'status': SignalStatus.PENDING,
-                    'entry_price': None,  # Will be set when executed
-                    'target_price': None,  # Not applicable for volatility strategies
-                    'stop_loss': None,  # Not applicable for volatility strategies
-                    'confidence_score': 0.7 * (1 - volatility_data.iv_percentile / 100),  # Higher confidence for lower IV percentile
-                    'time_frame': '7d',
-                    'option_id': atm_call.id,
-                    'option_strike': atm_call.strike_price,
-                    'option_expiration': atm_call.expiration_date,
-                    'implied_volatility': volatility_data.implied_volatility_avg,
-                    'parameters': {
-                        'iv_percentile': volatility_data.iv_percentile,
-                        'iv_rank': volatility_data.iv_rank,
-                        'strategy': 'long_volatility'
-                    },
-                    'notes': f"Low IV percentile signal for {instrument.symbol}. IV Percentile: {volatility_data.iv_percentile:.2f}%, IV Rank: {volatility_data.iv_rank:.2f}%"
-                }
-                
-                # Save signal
-                signal = self.save_signal(signal_data)
-                
-                if signal:
-                    # Save signal factors
-                    self.save_signal_factor({
-                        'factor_name': 'iv_percentile',
-                        'factor_value': volatility_data.iv_percentile,
-                        'factor_weight': 0.6,
-                        'factor_category': 'volatility',
-                        'factor_description': f"IV Percentile: {volatility_data.iv_percentile:.2f}%"
-                    })
-                    
-                    self.save_signal_factor({
-                        'factor_name': 'iv_rank',
-                        'factor_value': volatility_data.iv_rank,
-                        'factor_weight': 0.4,
-                        'factor_category': 'volatility',
-                        'factor_description': f"IV Rank: {volatility_data.iv_rank:.2f}%"
-                    })
+            # Only extreme IV percentiles produce a signal
+            iv_percentile = volatility_data.iv_percentile
+            if 20 <= iv_percentile <= 80:
+                return
             
-            # Check for high IV percentile
-            elif volatility_data.iv_percentile > 80:
-                # High IV, potential for short volatility strategies
-                
-                # Check for options with 7 DTE
-                target_date = datetime.utcnow().date() + timedelta(days=7)
-                min_date = target_date - timedelta(days=2)
-                max_date = target_date + timedelta(days=2)
-                
-                # Get current price
-                current_price = self.db.query(StockPrice).filter(
-                    StockPrice.instrument_id == instrument.id
-                ).order_by(StockPrice.timestamp.desc()).first().close
-                
-                # Find call options
-                call_options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'call'
-                ).all()
-                
-                # Find put options
-                put_options = self.db.query(Option).filter(
-                    Option.instrument_id == instrument.id,
-                    Option.expiration_date >= min_date,
-                    Option.expiration_date <= max_date,
-                    Option.option_type == 'put'
-                ).all()
-                
-                if not call_options or not put_options:
-                    logger.warning(f"No suitable options found for {instrument.symbol}")
-                    return
-                
-                # Find ATM options
-                atm_call = min(call_options, key=lambda x: abs(x.strike_price - current_price))
-                atm_put = min(put_options, key=lambda x: abs(x.strike_price - current_price))
-                
-                # Create signal for short straddle
-                signal_data = {
-                    'instrument_id': instrument.id,
-                    'signal_type': SignalType.SHORT_CALL,  # Simplified to short call for now
-                    'signal_source': SignalSource.VOLATILITY,
-                    'status': SignalStatus.PENDING,
-                    'entry_price': None,  # Will be set when executed
-                    'target_price': None,  # Not applicable for volatility strategies
-                    'stop_loss': None,  # Not applicable for volatility strategies
-                    'confidence_score': 0.7 * (volatility_data.iv_percentile / 100),  # Higher confidence for higher IV percentile
-                    'time_frame': '7d',
-                    'option_id': atm_call.id,
-                    'option_strike': atm_call.strike_price,
-                    'option_expiration': atm_call.expiration_date,
-                    'implied_volatility': volatility_data.implied_volatility_avg,
-                    'parameters': {
-                        'iv_percentile': volatility_data.iv_percentile,
-                        'iv_rank': volatility_data.iv_rank,
-                        'strategy': 'short_volatility'
-                    },
-                    'notes': f"High IV percentile signal for {instrument.symbol}. IV Percentile: {volatility_data.iv_percentile:.2f}%, IV Rank: {volatility_data.iv_rank:.2f}%"
+            if iv_percentile < 20:
+                # Low IV, potential for long volatility strategies.
+                # Simplified to a long call for now.
+                signal_type, strategy, level = SignalType.LONG_CALL, 'long_volatility', 'Low'
+                confidence_score = 0.7 * (1 - iv_percentile / 100)  # Higher confidence for lower IV percentile
+            else:
+                # High IV, potential for short volatility strategies.
+                # Simplified to a short call for now.
+                signal_type, strategy, level = SignalType.SHORT_CALL, 'short_volatility', 'High'
+                confidence_score = 0.7 * (iv_percentile / 100)  # Higher confidence for higher IV percentile
+            
+            # Find the straddle's ATM call and put in one query, resolving the
+            # latest close in the same statement unless it is already cached
+            atm_options = self._query_atm_straddle(instrument.id, self._price_cache.get(instrument.id))
+            
+            if 'call' not in atm_options or 'put' not in atm_options:
+                logger.warning(f"No suitable options found for {instrument.symbol}")
+                return
+            
+            atm_call = atm_options['call']
+            
+            # Create signal
+            signal_data = {
+                'instrument_id': instrument.id,
+                'signal_type': signal_type,
+                'signal_source': SignalSource.VOLATILITY,
+                'status': SignalStatus.PENDING,
+                'entry_price': None,  # Will be set when executed
+                'target_price': None,  # Not applicable for volatility strategies
+                'stop_loss': None,  # Not applicable for volatility strategies
+                'confidence_score': confidence_score,
+                'time_frame': '7d',
+                'option_id': atm_call.id,
+                'option_strike': atm_call.strike_price,
+                'option_expiration': atm_call.expiration_date,
+                'implied_volatility': volatility_data.implied_volatility_avg,
+                'parameters': {
+                    'iv_percentile': iv_percentile,
+                    'iv_rank': volatility_data.iv_rank,
+                    'strategy': strategy
+                },
+                'notes': ('iv_percentile', level, instrument.symbol, iv_percentile, volatility_data.iv_rank)
+            }
+            
+            # Save signal and its factors; a failed save is retried on the next call
+            signal = self.save_signal(signal_data, [
+                {
+                    'factor_name': 'iv_percentile',
+                    'factor_value': iv_percentile,
+                    'factor_weight': 0.6,
+                    'factor_category': 'volatility',
+                    'factor_description': f"IV Percentile: {iv_percentile:.2f}%"
+                },
+                {
+                    'factor_name': 'iv_rank',
+                    'factor_value': volatility_data.iv_rank,
+                    'factor_weight': 0.4,
+                    'factor_category': 'volatility',
+                    'factor_description': f"IV Rank: {volatility_data.iv_rank:.2f}%"
                 }
-                
-                # Save signal
-                signal = self.save_signal(signal_data)
-                
-                if signal:
-                    # Save signal factors
-                    self.save_signal_factor({
-                        'factor_name': 'iv_percentile',
-                        'factor_value': volatility_data.iv_percentile,
-                        'factor_weight': 0.6,
-                        'factor_category': 'volatility',
-                        'factor_description': f"IV Percentile: {volatility_data.iv_percentile:.2f}%"
-                    })
-                    
-                    self.save_signal_factor({
-                        'factor_name': 'iv_rank',
-                        'factor_value': volatility_data.iv_rank,
-                        'factor_weight': 0.4,
-                        'factor_category': 'volatility',
-                        'factor_description': f"IV Rank: {volatility_data.iv_rank:.2f}%"
-                    })
+            ])
+            if signal is None:
+                return False
         
         except Exception as e:
             logger.error(f"Error generating IV percentile signals for {instrument.symbol}: {e}")
+            return False
     
     async def generate_iv_skew_signals(self, instrument: Instrument):
         """Generate signals based on implied volatility skew."""
@@ -1162,229 +1203,199 @@ class VolatilitySignalGenerator(SignalGenerator):
 class EnsembleSignalGenerator(SignalGenerator):
     """Generate signals based on ensemble of multiple signal sources."""
     
-    def __init__(self, db: Session):
-        super().__init__(db)
-        self.technical_generator = TechnicalSignalGenerator(db)
-        self.fundamental_generator = FundamentalSignalGenerator(db)
-        self.volatility_generator = VolatilitySignalGenerator(db)
+    def __init__(self, db: Session, session_factory: Callable[[], Session] = SessionLocal):
+        super().__init__(db, session_factory)
+        self.generator_classes = (
+            TechnicalSignalGenerator,
+            FundamentalSignalGenerator,
+            VolatilitySignalGenerator
+        )
     
-    async def generate_signals(self):
+    def _run_generator(self, generator_class):
+        """Run an individual generator to completion on its own session at the ensemble's cycle time."""
+        db = self.session_factory()
+        try:
+            asyncio.run(generator_class(db, self.session_factory).generate_signals(self._now))
+        finally:
+            db.close()
+    
+    async def generate_signals(self, now: Optional[datetime] = None):
         """Generate ensemble signals for all Mag7 stocks."""
-        # First, generate signals from individual generators
-        await self.technical_generator.generate_signals()
-        await self.fundamental_generator.generate_signals()
-        await self.volatility_generator.generate_signals()
+        self._refresh_clock(now)
+        
+        # First, run the individual generators concurrently. Each gets its
+        # own session and thread since the database driver is synchronous.
+        await asyncio.gather(*[
+            asyncio.to_thread(self._run_generator, generator_class)
+            for generator_class in self.generator_classes
+        ])
         
         # Then, generate ensemble signals based on the individual signals
-        for symbol in settings.MAG7_SYMBOLS:
-            try:
-                # Get instrument
-                instrument = self.db.query(Instrument).filter(Instrument.symbol == symbol).first()
-                if not instrument:
-                    logger.warning(f"Instrument {symbol} not found in database")
-                    continue
-                
-                # Get recent signals
-                recent_signals = self.db.query(Signal).filter(
-                    Signal.instrument_id == instrument.id,
-                    Signal.generation_time >= datetime.utcnow() - timedelta(days=1)
-                ).all()
-                
-                # Count bullish and bearish signals
-                bullish_signals = [s for s in recent_signals if s.signal_type in [SignalType.LONG_CALL, SignalType.SHORT_PUT]]
-                bearish_signals = [s for s in recent_signals if s.signal_type in [SignalType.LONG_PUT, SignalType.SHORT_CALL]]
-                
-                # Calculate weighted confidence
-                bullish_confidence = sum(s.confidence_score for s in bullish_signals) if bullish_signals else 0
-                bearish_confidence = sum(s.confidence_score for s in bearish_signals) if bearish_signals else 0
-                
-                # Generate ensemble signal if there's a clear bias
-                if bullish_confidence > 1.5 and bullish_confidence > bearish_confidence * 2:
-                    # Strong bullish bias
-                    await self.generate_ensemble_bullish_signal(instrument, bullish_signals)
-                elif bearish_confidence > 1.5 and bearish_confidence > bullish_confidence * 2:
-                    # Strong bearish bias
-                    await self.generate_ensemble_bearish_signal(instrument, bearish_signals)
-            
-            except Exception as e:
-                logger.error(f"Error generating ensemble signals for {symbol}: {e}")
+        self._load_instruments(settings.MAG7_SYMBOLS)
+        instrument_ids = [instrument.id for instrument in self._instrument_cache.values()]
+        await self._load_cached_closes(list(self._instrument_cache.values()))
+        missing_ids = [iid for iid in instrument_ids if iid not in self._price_cache]
+        if missing_ids:
+            self._load_latest_closes(missing_ids)
+        self._option_cache = self._load_option_cache(instrument_ids)
+        await self._gather_symbols(settings.MAG7_SYMBOLS, EnsembleSignalGenerator._generate_for_symbol)
     
-    async def generate_ensemble_bullish_signal(self, instrument: Instrument, bullish_signals: List[Signal]):
-        """Generate ensemble bullish signal."""
+    async def _load_cached_closes(self, instruments: List[Instrument]):
+        """Seed the price cache from the tick pipeline's market data in Redis with one MGET."""
         try:
-            # Check for options with 7 DTE
-            target_date = datetime.utcnow().date() + timedelta(days=7)
-            min_date = target_date - timedelta(days=2)
-            max_date = target_date + timedelta(days=2)
-            
-            # Get current price
-            current_price = self.db.query(StockPrice).filter(
-                StockPrice.instrument_id == instrument.id
-            ).order_by(StockPrice.timestamp.desc()).first().close
-            
-            # Find call options
-            call_options = self.db.query(Option).filter(
-                Option.instrument_id == instrument.id,
-                Option.expiration_date >= min_date,
-                Option.expiration_date <= max_date,
-                Option.option_type == 'call'
-            ).all()
+            values = await get_redis_client().mget(
+                [f"market:{instrument.symbol}:current" for instrument in instruments]
+            )
             
-            if not call_options:
-                logger.warning(f"No suitable options found for {instrument.symbol}")
+            for instrument, value in zip(instruments, values):
+                if value is None:
+                    continue
+                price = json.loads(value).get('price')
+                if price is not None:
+                    self._price_cache[instrument.id] = float(price)
+        except Exception as e:
+            logger.warning("Redis price lookup failed, falling back to the database: %s", e)
+    
+    async def _generate_for_symbol(self, symbol: str):
+        """Generate ensemble signals for one symbol."""
+        try:
+            # Get instrument
+            instrument = self._get_instrument(symbol)
+            if not instrument:
+                logger.warning("Instrument %s not found in database", symbol)
                 return
             
-            # Find ATM option
-            atm_call = min(call_options, key=lambda x: abs(x.strike_price - current_price))
+            since = self._now - timedelta(days=1)
             
-            # Calculate ensemble confidence
-            ensemble_confidence = min(0.95, sum(s.confidence_score for s in bullish_signals) / len(bullish_signals) * 1.2)
+            # Sum recent confidence by signal type in the database
+            instrument_id = instrument.id
+            confidence_by_type = dict(self.db.execute(lambda_stmt(
+                lambda: select(
+                    Signal.signal_type,
+                    func.sum(Signal.confidence_score)
+                ).where(
+                    Signal.instrument_id == instrument_id,
+                    Signal.generation_time >= since
+                ).group_by(Signal.signal_type)
+            )).all())
             
-            # Create signal
-            signal_data = {
-                'instrument_id': instrument.id,
-                'signal_type': SignalType.LONG_CALL,
-                'signal_source': SignalSource.ENSEMBLE,
-                'status': SignalStatus.PENDING,
-                'entry_price': None,  # Will be set when executed
-                'target_price': current_price * 1.05,  # 5% profit target
-                'stop_loss': current_price * 0.97,  # 3% stop loss
-                'confidence_score': ensemble_confidence,
-                'time_frame': '7d',
-                'option_id': atm_call.id,
-                'option_strike': atm_call.strike_price,
-                'option_expiration': atm_call.expiration_date,
-                'parameters': {
-                    'component_signals': [s.id for s in bullish_signals],
-                    'component_count': len(bullish_signals)
-                },
-                'notes': f"Ensemble bullish signal for {instrument.symbol} based on {len(bullish_signals)} component signals."
-            }
-            
-            # Save signal
-            signal = self.save_signal(signal_data)
+            bullish_confidence = sum(confidence_by_type.get(t) or 0.0 for t in _BULLISH)
+            bearish_confidence = sum(confidence_by_type.get(t) or 0.0 for t in _BEARISH)
             
-            if signal:
-                # Save signal factors
-                self.save_signal_factor({
-                    'factor_name': 'ensemble_component_count',
-                    'factor_value': len(bullish_signals),
-                    'factor_weight': 0.3,
-                    'factor_category': 'ensemble',
-                    'factor_description': f"Number of component signals: {len(bullish_signals)}"
-                })
-                
-                # Add factors for each signal source
-                source_counts = {}
-                for s in bullish_signals:
-                    source = s.signal_source.value
-                    source_counts[source] = source_counts.get(source, 0) + 1
-                
-                for source, count in source_counts.items():
-                    self.save_signal_factor({
-                        'factor_name': f"{source}_signal_count",
-                        'factor_value': count,
-                        'factor_weight': 0.7 / len(source_counts),
-                        'factor_category': 'ensemble',
-                        'factor_description': f"Number of {source} signals: {count}"
-                    })
+            # Generate ensemble signal if there's a clear bias, loading the
+            # component signals only then
+            if bullish_confidence > 1.5 and bullish_confidence > bearish_confidence * 2:
+                # Strong bullish bias
+                bullish_signals = self._get_recent_signals(instrument.id, _BULLISH, since)
+                await self.generate_ensemble_bullish_signal(instrument, bullish_signals)
+            elif bearish_confidence > 1.5 and bearish_confidence > bullish_confidence * 2:
+                # Strong bearish bias
+                bearish_signals = self._get_recent_signals(instrument.id, _BEARISH, since)
+                await self.generate_ensemble_bearish_signal(instrument, bearish_signals)
         
         except Exception as e:
-            logger.error(f"Error generating ensemble bullish signal for {instrument.symbol}: {e}")
+            logger.error("Error generating ensemble signals for %s: %s", symbol, e)
     
-    async def generate_ensemble_bearish_signal(self, instrument: Instrument, bearish_signals: List[Signal]):
+    def _get_recent_signals(self, instrument_id: int, signal_types: FrozenSet[SignalType], since: datetime) -> List[Row]:
+        """Get the id, confidence and source of an instrument's signals of the given types generated since a cutoff."""
+        return self.db.execute(lambda_stmt(
+            lambda: select(
+                Signal.id,
+                Signal.confidence_score,
+                Signal.signal_source
+            ).where(
+                Signal.instrument_id == instrument_id,
+                Signal.signal_type.in_(signal_types),
+                Signal.generation_time >= since
+            )
+        )).all()
+    
+    async def generate_ensemble_bullish_signal(self, instrument: Instrument, bullish_signals: List[Row]):
+        """Generate ensemble bullish signal."""
+        await self._generate_ensemble_signal(instrument, bullish_signals, 'bullish')
+    
+    async def generate_ensemble_bearish_signal(self, instrument: Instrument, bearish_signals: List[Row]):
         """Generate ensemble bearish signal."""
+        await self._generate_ensemble_signal(instrument, bearish_signals, 'bearish')
+    
+    async def _generate_ensemble_signal(self, instrument: Instrument, component_signals: List[Row], side: str):
+        """Generate an ensemble signal on the 'bullish' (long call) or 'bearish' (long put) side."""
         try:
-            # Check for options with 7 DTE
-            target_date = datetime.utcnow().date() + timedelta(days=7)
-            min_date = target_date - timedelta(days=2)
-            max_date = target_date + timedelta(days=2)
+            signal_type, option_type, target_ratio, stop_ratio = _ENSEMBLE_SIDES[side]
             
             # Get current price
-            current_price = self.db.query(StockPrice).filter(
-                StockPrice.instrument_id == instrument.id
-            ).order_by(StockPrice.timestamp.desc()).first().close
-            
-            # Find put options
-            put_options = self.db.query(Option).filter(
-                Option.instrument_id == instrument.id,
-                Option.expiration_date >= min_date,
-                Option.expiration_date <= max_date,
-                Option.option_type == 'put'
-            ).all()
-            
-            if not put_options:
-                logger.warning(f"No suitable options found for {instrument.symbol}")
+            current_price = self._get_latest_close(instrument.id)
+            if current_price is None:
+                logger.warning("No price data found for %s", instrument.symbol)
                 return
             
-            # Find ATM option
-            atm_put = min(put_options, key=lambda x: abs(x.strike_price - current_price))
+            # Find ATM option in the run's preloaded chains
+            atm_option = self._find_atm_option(instrument.id, option_type, current_price)
+            
+            if not atm_option:
+                logger.warning("No suitable options found for %s", instrument.symbol)
+                return
             
             # Calculate ensemble confidence
-            ensemble_confidence = min(0.95, sum(s.confidence_score for s in bearish_signals) / len(bearish_signals) * 1.2)
+            ensemble_confidence = min(0.95, fmean(s.confidence_score for s in component_signals) * 1.2)
             
             # Create signal
-            signal_data = {
-                'instrument_id': instrument.id,
-                'signal_type': SignalType.LONG_PUT,
-                'signal_source': SignalSource.ENSEMBLE,
-                'status': SignalStatus.PENDING,
-                'entry_price': None,  # Will be set when executed
-                'target_price': current_price * 0.95,  # 5% profit target
-                'stop_loss': current_price * 1.03,  # 3% stop loss
-                'confidence_score': ensemble_confidence,
-                'time_frame': '7d',
-                'option_id': atm_put.id,
-                'option_strike': atm_put.strike_price,
-                'option_expiration': atm_put.expiration_date,
-                'parameters': {
-                    'component_signals': [s.id for s in bearish_signals],
-                    'component_count': len(bearish_signals)
+            signal_data = SignalPayload(
+                instrument_id=instrument.id,
+                signal_type=signal_type,
+                signal_source=SignalSource.ENSEMBLE,
+                target_price=current_price * target_ratio,
+                stop_loss=current_price * stop_ratio,
+                confidence_score=ensemble_confidence,
+                option_id=atm_option.id,
+                option_strike=atm_option.strike_price,
+                option_expiration=atm_option.expiration_date,
+                parameters={
+                    'component_signals': [s.id for s in component_signals],
+                    'component_count': len(component_signals)
                 },
-                'notes': f"Ensemble bearish signal for {instrument.symbol} based on {len(bearish_signals)} component signals."
-            }
+                notes=('ensemble', side, instrument.symbol, len(component_signals))
+            )
             
-            # Save signal
-            signal = self.save_signal(signal_data)
+            factors = [{
+                'factor_name': 'ensemble_component_count',
+                'factor_value': len(component_signals),
+                'factor_weight': 0.3,
+                'factor_category': 'ensemble',
+                'factor_description': f"Number of component signals: {len(component_signals)}"
+            }]
             
-            if signal:
-                # Save signal factors
-                self.save_signal_factor({
-                    'factor_name': 'ensemble_component_count',
-                    'factor_value': len(bearish_signals),
-                    'factor_weight': 0.3,
-                    'factor_category': 'ensemble',
-                    'factor_description': f"Number of component signals: {len(bearish_signals)}"
-                })
-                
-                # Add factors for each signal source
-                source_counts = {}
-                for s in bearish_signals:
-                    source = s.signal_source.value
-                    source_counts[source] = source_counts.get(source, 0) + 1
-                
-                for source, count in source_counts.items():
-                    self.save_signal_factor({
-                        'factor_name': f"{source}_signal_count",
-                        'factor_value': count,
-                        'factor_weight': 0.7 / len(source_counts),
-                        'factor_category': 'ensemble',
-                        'factor_description': f"Number of {source} signals: {count}"
-                    })
+            # Add factors for each signal source
+            source_counts = Counter(s.signal_source.value for s in component_signals)
+            source_weight = 0.7 / len(source_counts)
+            factors.extend({
+                'factor_name': f"{source}_signal_count",
+                'factor_value': count,
+                'factor_weight': source_weight,
+                'factor_category': 'ensemble',
+                'factor_description': f"Number of {source} signals: {count}"
+            } for source, count in source_counts.items())
+            
+            # Save signal and its factors in one transaction
+            self.save_signals([(signal_data, factors)])
         
         except Exception as e:
-            logger.error(f"Error generating ensemble bearish signal for {instrument.symbol}: {e}")
+            logger.error("Error generating ensemble %s signal for %s: %s", side, instrument.symbol, e)
 
 async def signal_generation_main():
     """Main function for signal generation service."""
     logger.info("Starting signal generation service...")
     
+    # Reuse one session registry across cycles; connections come from the engine pool
+    session_registry = scoped_session(SessionLocal)
+    
+    # Run cycles on a fixed cadence measured from the monotonic clock
+    interval = settings.SIGNAL_GENERATION_INTERVAL * 60  # Convert minutes to seconds
+    deadline = time.monotonic()
+    
     while True:
         try:
-            # Create database session
-            db = SessionLocal()
-            
-            try:
+            with session_registry() as db:
                 # Create ensemble signal generator
                 generator = EnsembleSignalGenerator(db)
                 
@@ -1392,15 +1403,20 @@ async def signal_generation_main():
                 await generator.generate_signals()
                 
                 logger.info("Signal generation completed successfully")
-            finally:
-                db.close()
             
-            # Wait for next cycle
-            await asyncio.sleep(settings.SIGNAL_GENERATION_INTERVAL * 60)  # Convert minutes to seconds
+            # Wait for next cycle, skipping any that a slow cycle ran past
+            deadline += interval
+            behind = time.monotonic() - deadline
+            if behind >= interval:
+                missed = int(behind // interval)
+                logger.warning("Signal generation fell %d cycles behind, skipping them", missed)
+                deadline += missed * interval
+            await asyncio.sleep(max(0.0, deadline - time.monotonic()))
         
         except Exception as e:
-            logger.error(f"Error in signal generation main loop: {e}")
+            logger.error("Error in signal generation main loop: %s", e)
             await asyncio.sleep(60)  # Wait 1 minute before retrying
+            deadline = time.monotonic()
 
 if __name__ == "__main__":
     asyncio.run(signal_generation_main())
@@ -1,9 +1,14 @@
+import asyncio
 import logging
+import threading
 import pandas as pd
 import numpy as np
-from datetime import datetime, timedelta
-from typing import Dict, List, Optional, Any, Tuple
-from sqlalchemy.orm import Session
+from collections import defaultdict
+from concurrent.futures import Executor, Future
+from datetime import date, datetime, time, timedelta
+from typing import Callable, Dict, List, Optional, Any, Tuple
+from sqlalchemy import insert, inspect
+from sqlalchemy.orm import Session, scoped_session, selectinload, sessionmaker
 
 from app.models.market_data import Instrument, Option
 from app.models.signal import Signal, SignalType, SignalSource, SignalStatus, SignalFactor
@@ -25,50 +30,188 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for a single sub-strategy before skipping it
+STRATEGY_TIMEOUT = 60
+
+# Ensemble sides as (signal type, default target ratio, default stop loss
+# ratio, direction): 5% profit target, 3% stop loss
+_ENSEMBLE_SIDES = {
+    'call': (SignalType.LONG_CALL, 1.05, 0.97, 'bullish'),
+    'put': (SignalType.LONG_PUT, 0.95, 1.03, 'bearish')
+}
+
+def _weighted_mean(values: np.ndarray, weights: np.ndarray) -> float:
+    """Weighted mean of values, or 0.0 when the weights sum to zero."""
+    total_weight = weights.sum()
+    if total_weight > 0:
+        return float(np.dot(values, weights) / total_weight)
+    return 0.0
+
+def _run_strategy(strategy, instrument: Instrument, sessions: scoped_session) -> List[Signal]:
+    """Run one sub-strategy on the worker thread's session and release the session afterwards."""
+    try:
+        return strategy.generate_signals(instrument)
+    finally:
+        sessions.remove()
+
+def _run_inline(strategy, instrument: Instrument) -> Future:
+    """Run one sub-strategy on the calling thread and wrap its outcome in a completed future."""
+    future = Future()
+    try:
+        future.set_result(strategy.generate_signals(instrument))
+    except Exception as e:
+        future.set_exception(e)
+    return future
+
+class SignalCache:
+    """
+    Sub-strategy results shared by ensembles that run over the same instruments in one tick.
+    
+    Results are cached as futures keyed by strategy name and instrument ID for
+    the current tick, so an ensemble running concurrently with another waits
+    for the same in-flight run instead of starting a second one. Starting a
+    new tick drops the results of the previous one.
+    """
+    
+    def __init__(self):
+        self._tick: Optional[datetime] = None
+        self._futures: Dict[Tuple[str, int], Future] = {}
+        self._lock = threading.Lock()
+    
+    def submit(self, strategy_name: str, instrument: Instrument, tick: datetime, start: Callable[[], Future]) -> Future:
+        """
+        Get the future for a sub-strategy run on the instrument in this tick, calling start() on a miss.
+        """
+        key = (strategy_name, instrument.id)
+        with self._lock:
+            if tick != self._tick:
+                self._tick = tick
+                self._futures.clear()
+            
+            future = self._futures.get(key)
+            if future is None:
+                future = start()
+                self._futures[key] = future
+        
+        return future
+
 class EnsembleStrategy:
     """
     Ensemble strategy that combines signals from multiple strategies.
     """
     
-    def __init__(self, db: Session, min_confidence: float = 0.6, min_strategies: int = 2):
+    # Indicator, confidence parameter and notes recorded on generated signals
+    indicator = 'ensemble'
+    confidence_key = 'avg_confidence'
+    notes_template = "Ensemble {direction} signal for {symbol}. {count} strategies with avg confidence {confidence:.2f}"
+    
+    def __init__(
+        self,
+        db: Session,
+        min_confidence: float = 0.6,
+        min_strategies: int = 2,
+        store_factor_descriptions: bool = False,
+        signal_cache: Optional[SignalCache] = None,
+        session_factory: Optional[sessionmaker] = None,
+        executor: Optional[Executor] = None
+    ):
+        if (session_factory is None) != (executor is None):
+            raise ValueError("session_factory and executor must be given together")
+        
         self.db = db
         self.min_confidence = min_confidence
         self.min_strategies = min_strategies
         
+        # Sub-strategy results shared with other ensembles in the same tick
+        self.signal_cache = signal_cache
+        
+        # Component factor descriptions are derivable from the factor name, value
+        # and weight (see describe_factor), so they are only stored when asked for
+        self.store_factor_descriptions = store_factor_descriptions
+        
+        # Option chains by (instrument_id, option_type, days_to_expiration) from prewarm_atm_options()
+        self._atm_cache: Dict[Tuple[int, str, int], List[Option]] = {}
+        
+        # Sub-strategies run one after another on db itself, sharing the caller's
+        # transaction. Given a session_factory and an executor, they run
+        # concurrently on the executor with thread-local sessions from the
+        # factory instead. The factory should set expire_on_commit=False so the
+        # returned signals can be read from the calling thread. The caller owns
+        # the executor: each worker holds a connection, so it should have no
+        # more workers than the factory's connection pool (DB_POOL_SIZE), and
+        # the caller shuts it down when done.
+        self._executor = executor
+        self._strategy_sessions: Optional[scoped_session] = None
+        strategy_db = db
+        if session_factory is not None:
+            self._strategy_sessions = scoped_session(session_factory)
+            strategy_db = self._strategy_sessions
+        
         # Initialize individual strategies
         self.strategies = {
             # Technical strategies
-            'rsi': RSIStrategy(db),
-            'macd': MACDStrategy(db),
-            'bollinger': BollingerBandsStrategy(db),
-            'momentum': MomentumStrategy(db),
+            'rsi': RSIStrategy(strategy_db),
+            'macd': MACDStrategy(strategy_db),
+            'bollinger': BollingerBandsStrategy(strategy_db),
+            'momentum': MomentumStrategy(strategy_db),
             
             # Fundamental strategies
-            'earnings': EarningsStrategy(db),
-            'valuation': ValuationStrategy(db),
-            'analyst': AnalystRatingStrategy(db),
+            'earnings': EarningsStrategy(strategy_db),
+            'valuation': ValuationStrategy(strategy_db),
+            'analyst': AnalystRatingStrategy(strategy_db),
             
             # Volatility strategies
-            'iv_percentile': IVPercentileStrategy(db),
-            'iv_skew': IVSkewStrategy(db),
-            'vol_surface': VolatilitySurfaceStrategy(db)
+            'iv_percentile': IVPercentileStrategy(strategy_db),
+            'iv_skew': IVSkewStrategy(strategy_db),
+            'vol_surface': VolatilitySurfaceStrategy(strategy_db)
         }
+        
+        # The strategy set is fixed, so iterate over a prebuilt tuple of (name, strategy) pairs
+        self._strategy_items = tuple(self.strategies.items())
     
-    def find_atm_options(self, instrument_id: int, current_price: float, option_type: str, days_to_expiration: int = 7) -> Optional[Option]:
+    def _expiration_window(self, days_to_expiration: int, today: Optional[date] = None) -> Tuple[date, date]:
         """
-        Find at-the-money options for a given instrument.
+        Get the expiration date window around the target days to expiration from today.
+        """
+        target_date = (today or datetime.utcnow().date()) + timedelta(days=days_to_expiration)
+        return target_date - timedelta(days=2), target_date + timedelta(days=2)
+    
+    def prewarm_atm_options(self, instrument_ids: List[int], days_to_expiration: int = 7, today: Optional[date] = None):
         """
-        target_date = datetime.utcnow().date() + timedelta(days=days_to_expiration)
-        min_date = target_date - timedelta(days=2)
-        max_date = target_date + timedelta(days=2)
+        Load the option chains for several instruments with one query so ATM lookups skip the database.
+        Replaces any chains cached by a previous sweep.
+        """
+        self._atm_cache.clear()
+        min_date, max_date = self._expiration_window(days_to_expiration, today)
         
         options = self.db.query(Option).filter(
-            Option.instrument_id == instrument_id,
-            Option.expiration_date >= min_date,
-            Option.expiration_date <= max_date,
-            Option.option_type == option_type
+            Option.instrument_id.in_(instrument_ids),
+            Option.expiration_date.between(min_date, max_date),
+            Option.option_type.in_(['call', 'put'])
         ).all()
         
+        # Cache empty chains too so instruments without options are not queried again
+        for instrument_id in instrument_ids:
+            for option_type in ('call', 'put'):
+                self._atm_cache[(instrument_id, option_type, days_to_expiration)] = []
+        for option in options:
+            self._atm_cache[(option.instrument_id, option.option_type, days_to_expiration)].append(option)
+    
+    def find_atm_options(self, instrument_id: int, current_price: float, option_type: str, days_to_expiration: int = 7, today: Optional[date] = None) -> Optional[Option]:
+        """
+        Find at-the-money options for a given instrument.
+        """
+        options = self._atm_cache.get((instrument_id, option_type, days_to_expiration))
+        if options is None:
+            min_date, max_date = self._expiration_window(days_to_expiration, today)
+            
+            options = self.db.query(Option).filter(
+                Option.instrument_id == instrument_id,
+                Option.expiration_date >= min_date,
+                Option.expiration_date <= max_date,
+                Option.option_type == option_type
+            ).all()
+        
         if not options:
             logger.warning(f"No suitable options found for instrument ID {instrument_id}")
             return None
@@ -78,18 +221,91 @@ class EnsembleStrategy:
         
         return atm_option
     
-    def save_signal(self, signal_data: Dict[str, Any]) -> Optional[Signal]:
+    def load_instruments_with_options(self, symbols: List[str], days_to_expiration: int = 7, today: Optional[date] = None) -> List[Instrument]:
+        """
+        Load instruments with their options in the expiration window prefetched by one selectin query.
+        """
+        min_date, max_date = self._expiration_window(days_to_expiration, today)
+        
+        return self.db.query(Instrument).filter(
+            Instrument.symbol.in_(symbols)
+        ).options(
+            selectinload(Instrument.options.and_(Option.expiration_date.between(min_date, max_date)))
+        ).all()
+    
+    @staticmethod
+    def _loaded_options(instrument: Optional[Instrument], min_date: date, max_date: date) -> Optional[List[Option]]:
+        """
+        Get the instrument's options in the expiration window if its options relationship is already loaded.
+        """
+        state = inspect(instrument, raiseerr=False) if instrument is not None else None
+        if state is None or 'options' in state.unloaded:
+            return None
+        
+        # Compare as datetimes, matching the database filter on the date window
+        window_start = datetime.combine(min_date, time.min)
+        window_end = datetime.combine(max_date, time.min)
+        return [option for option in instrument.options if window_start <= option.expiration_date <= window_end]
+    
+    def find_atm_options_both(
+        self,
+        instrument_id: int,
+        current_price: float,
+        days_to_expiration: int = 7,
+        today: Optional[date] = None,
+        instrument: Optional[Instrument] = None
+    ) -> Dict[str, Optional[Option]]:
+        """
+        Find at-the-money call and put options for a given instrument with a single query.
+        
+        Uses prewarmed chains or the instrument's already loaded options when available.
+        """
+        options_by_type = {
+            option_type: self._atm_cache.get((instrument_id, option_type, days_to_expiration))
+            for option_type in ('call', 'put')
+        }
+        
+        if None in options_by_type.values():
+            min_date, max_date = self._expiration_window(days_to_expiration, today)
+            
+            options = self._loaded_options(instrument, min_date, max_date)
+            if options is None:
+                options = self.db.query(Option).filter(
+                    Option.instrument_id == instrument_id,
+                    Option.expiration_date.between(min_date, max_date),
+                    Option.option_type.in_(['call', 'put'])
+                ).all()
+            
+            options_by_type = {
+                option_type: [option for option in options if option.option_type == option_type]
+                for option_type in ('call', 'put')
+            }
+        
+        if not any(options_by_type.values()):
+            logger.warning(f"No suitable options found for instrument ID {instrument_id}")
+        
+        # Find ATM option for each type
+        return {
+            option_type: min(options, key=lambda x: abs(x.strike_price - current_price)) if options else None
+            for option_type, options in options_by_type.items()
+        }
+    
+    def save_signal(self, signal_data: Dict[str, Any], commit: bool = True) -> Optional[Signal]:
         """
-        Save signal to database.
+        Save signal to database with a single INSERT ... RETURNING.
+        
+        With commit=False the signal stays in the open transaction so its
+        factors can be committed together with it.
         """
         try:
-            # Create signal
-            signal = Signal(**signal_data)
-            self.db.add(signal)
-            self.db.commit()
-            self.db.refresh(signal)
+            # Create signal and load it back in the same round trip
+            signal = self.db.scalars(insert(Signal).returning(Signal), [signal_data]).one()
+            signal_id, instrument_id = signal.id, signal.instrument_id
+            
+            if commit:
+                self.db.commit()
             
-            logger.info(f"Created signal: {signal.id} for instrument {signal.instrument_id}")
+            logger.info(f"Created signal: {signal_id} for instrument {instrument_id}")
             return signal
         except Exception as e:
             self.db.rollback()
@@ -114,174 +330,291 @@ class EnsembleStrategy:
             logger.error(f"Error saving signal factor: {e}")
             return None
     
-    def generate_signals(self, instrument: Instrument) -> List[Signal]:
+    def _submit_strategy(self, strategy_name: str, strategy, instrument: Instrument, now: Optional[datetime]) -> Future:
         """
-        Generate signals using an ensemble of strategies.
+        Start a sub-strategy run, reusing the shared signal cache for the tick when given one.
+        
+        Runs on a session factory are submitted to the executor; runs on db complete on the calling thread.
         """
-        all_signals = []
+        def start() -> Future:
+            if self._strategy_sessions is None:
+                return _run_inline(strategy, instrument)
+            return self._executor.submit(_run_strategy, strategy, instrument, self._strategy_sessions)
+        
+        if self.signal_cache is None or now is None:
+            return start()
+        return self.signal_cache.submit(strategy_name, instrument, now, start)
+    
+    def collect_strategy_signals(self, instrument: Instrument, now: Optional[datetime] = None) -> Dict[SignalType, List[Tuple[str, Signal]]]:
+        """
+        Run all sub-strategies concurrently and bucket their (strategy name, signal) pairs by signal type.
+        """
+        futures = {
+            name: self._submit_strategy(name, strategy, instrument, now)
+            for name, strategy in self._strategy_items
+        }
+        
+        buckets = defaultdict(list)
+        for name, future in futures.items():
+            try:
+                for signal in future.result(timeout=STRATEGY_TIMEOUT) or ():
+                    buckets[signal.signal_type].append((name, signal))
+            except Exception as e:
+                logger.error(f"Error generating signals for strategy {name}: {e}")
+        
+        return buckets
+    
+    async def collect_strategy_signals_async(self, instrument: Instrument, now: Optional[datetime] = None) -> Dict[SignalType, List[Tuple[str, Signal]]]:
+        """
+        Gather all sub-strategies from the event loop and bucket their signals by type.
+        """
+        # Shield the pool futures so a timeout here does not cancel a run shared with another ensemble
+        results = await asyncio.gather(
+            *(
+                asyncio.wait_for(
+                    asyncio.shield(asyncio.wrap_future(self._submit_strategy(name, strategy, instrument, now))),
+                    STRATEGY_TIMEOUT
+                )
+                for name, strategy in self._strategy_items
+            ),
+            return_exceptions=True
+        )
+        
+        buckets = defaultdict(list)
+        for (name, _), result in zip(self._strategy_items, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error generating signals for strategy {name}: {result!r}")
+                continue
+            for signal in result or ():
+                buckets[signal.signal_type].append((name, signal))
+        
+        return buckets
+    
+    def _strategy_factor(self, strategy_name: str, signal: Signal, strategy_weight: float) -> Dict[str, Any]:
+        """
+        Build the weighted strategy factor for a component signal.
+        """
+        return {
+            'factor_name': f"strategy_{strategy_name}",
+            'factor_value': signal.confidence_score,
+            'factor_weight': strategy_weight,
+            'factor_category': 'ensemble',
+            'factor_description': (
+                f"Strategy: {strategy_name}, Confidence: {signal.confidence_score:.2f}, Weight: {strategy_weight:.2f}"
+                if self.store_factor_descriptions else None
+            )
+        }
+    
+    @staticmethod
+    def describe_factor(factor: SignalFactor) -> str:
+        """
+        Describe an ensemble factor saved without a stored description.
+        """
+        if factor.factor_description:
+            return factor.factor_description
+        
+        kind, _, name = factor.factor_name.partition('_')
+        if kind == 'strategy':
+            return f"Strategy: {name}, Confidence: {factor.factor_value:.2f}, Weight: {factor.factor_weight:.2f}"
+        # Source factors from before source weights moved to the signal parameters
+        return f"Signal source: {name}, Weight: {factor.factor_value:.2f}"
+    
+    @staticmethod
+    def _confidences(signals: List[Tuple[str, Signal]]) -> np.ndarray:
+        """
+        Collect the confidence scores of (strategy name, signal) pairs into an array.
+        """
+        return np.fromiter((s.confidence_score for _, s in signals), dtype=np.float64, count=len(signals))
+    
+    @staticmethod
+    def _price_levels(signals: List[Tuple[str, Signal]], current_price: float, target_ratio: float, stop_ratio: float) -> Tuple[float, float]:
+        """
+        Average the component target prices and stop losses, defaulting to ratios of the current price.
+        """
+        targets = np.fromiter((s.target_price for _, s in signals if s.target_price is not None), dtype=np.float64)
+        stops = np.fromiter((s.stop_loss for _, s in signals if s.stop_loss is not None), dtype=np.float64)
+        
+        target_price = float(targets.mean()) if targets.size else current_price * target_ratio
+        stop_loss = float(stops.mean()) if stops.size else current_price * stop_ratio
+        
+        return target_price, stop_loss
+    
+    def save_signal_factors(self, signal_id: int, factors: List[Dict[str, Any]]) -> bool:
+        """
+        Save all factors for a signal with one bulk insert and a single commit.
+        """
+        try:
+            for factor_data in factors:
+                factor_data["signal_id"] = signal_id
+            self.db.bulk_insert_mappings(SignalFactor, factors)
+            self.db.commit()
+            
+            logger.info(f"Created {len(factors)} signal factors for signal {signal_id}")
+            return True
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"Error saving signal factors: {e}")
+            return False
+    
+    def _ensemble_confidence(self, signals: List[Tuple[str, Signal]]) -> Tuple[float, List[Tuple[float, float]]]:
+        """
+        Calculate the ensemble confidence as the average component confidence.
+        
+        Also returns the (strategy weight, source weight) of each signal for
+        its factor and parameters: equal strategy weights and a unit source weight.
+        """
+        return float(self._confidences(signals).mean()), [(1.0 / len(signals), 1.0)] * len(signals)
+    
+    def _emit_ensemble_signal(
+        self,
+        instrument: Instrument,
+        signals: List[Tuple[str, Signal]],
+        side: str,
+        current_price: float,
+        confidence: float,
+        factor_weights: List[Tuple[float, float]],
+        atm_option: Optional[Option]
+    ) -> Optional[Signal]:
+        """
+        Save a 'call' (bullish) or 'put' (bearish) ensemble signal with its factors.
+        """
+        if not atm_option:
+            return None
+        
+        signal_type, target_ratio, stop_ratio, direction = _ENSEMBLE_SIDES[side]
+        
+        # Calculate target price and stop loss
+        target_price, stop_loss = self._price_levels(signals, current_price, target_ratio, stop_ratio)
+        
+        # Create ensemble signal
+        signal_data = {
+            'instrument_id': instrument.id,
+            'signal_type': signal_type,
+            'signal_source': SignalSource.ENSEMBLE,
+            'status': SignalStatus.PENDING,
+            'entry_price': None,  # Will be set when executed
+            'target_price': target_price,
+            'stop_loss': stop_loss,
+            'confidence_score': confidence,
+            'time_frame': '7d',
+            'option_id': atm_option.id,
+            'option_strike': atm_option.strike_price,
+            'option_expiration': atm_option.expiration_date,
+            'parameters': {
+                'indicator': self.indicator,
+                'strategies': [name for name, _ in signals],
+                'strategy_count': len(signals),
+                self.confidence_key: confidence,
+                'sources': {
+                    strategy_signal.signal_source.value: source_weight
+                    for (_, strategy_signal), (_, source_weight) in zip(signals, factor_weights)
+                }
+            },
+            'notes': self.notes_template.format(
+                direction=direction, symbol=instrument.symbol, count=len(signals), confidence=confidence
+            )
+        }
+        
+        # Save signal
+        signal = self.save_signal(signal_data, commit=False)
+        if not signal:
+            return None
         
+        # Save strategy factors in one batch, committing them together with the signal
+        if not self.save_signal_factors(signal.id, [
+            self._strategy_factor(strategy_name, strategy_signal, strategy_weight)
+            for (strategy_name, strategy_signal), (strategy_weight, _) in zip(signals, factor_weights)
+        ]):
+            return None
+        
+        return signal
+    
+    def generate_signals(self, instrument: Instrument, now: Optional[datetime] = None) -> List[Signal]:
+        """
+        Generate signals using an ensemble of strategies.
+        
+        Ensembles sharing a signal cache reuse each other's sub-strategy
+        results when called with the same cycle time.
+        """
         try:
             # Get current price
             current_price = instrument.last_price
             if not current_price:
-                return all_signals
-            
-            # Collect signals from all strategies
-            strategy_signals = {}
-            
-            for name, strategy in self.strategies.items():
-                try:
-                    signals = strategy.generate_signals(instrument)
-                    if signals:
-                        strategy_signals[name] = signals
-                except Exception as e:
-                    logger.error(f"Error generating signals for strategy {name}: {e}")
+                return []
             
-            # Group signals by type
-            call_signals = []
-            put_signals = []
-            
-            for strategy_name, signals in strategy_signals.items():
-                for signal in signals:
-                    if signal.signal_type == SignalType.LONG_CALL:
-                        call_signals.append((strategy_name, signal))
-                    elif signal.signal_type == SignalType.LONG_PUT:
-                        put_signals.append((strategy_name, signal))
+            # Collect signals from all strategies, grouped by type
+            return self._combine_signals(instrument, current_price, self.collect_strategy_signals(instrument, now), now)
+        except Exception as e:
+            logger.error(f"Error generating {self.indicator.replace('_', ' ')} signals for {instrument.symbol}: {e}")
+            return []
+    
+    async def generate_signals_async(self, instrument: Instrument, now: Optional[datetime] = None) -> List[Signal]:
+        """
+        Generate signals using an ensemble of strategies from an event loop.
+        
+        Sub-strategies are gathered concurrently and the ensemble signals are
+        saved on a worker thread, so the loop is never blocked on the database.
+        Ensembles without a session_factory run their sub-strategies on the loop's thread.
+        """
+        try:
+            # Get current price
+            current_price = instrument.last_price
+            if not current_price:
+                return []
             
-            # Generate ensemble signals for calls
-            if len(call_signals) >= self.min_strategies:
-                # Calculate average confidence
-                avg_confidence = sum(s.confidence_score for _, s in call_signals) / len(call_signals)
-                
-                if avg_confidence >= self.min_confidence:
-                    # Find ATM call option
-                    atm_call = self.find_atm_options(instrument.id, current_price, 'call')
-                    if not atm_call:
-                        return all_signals
-                    
-                    # Calculate target price and stop loss
-                    target_prices = [s.target_price for _, s in call_signals if s.target_price is not None]
-                    stop_losses = [s.stop_loss for _, s in call_signals if s.stop_loss is not None]
-                    
-                    target_price = sum(target_prices) / len(target_prices) if target_prices else current_price * 1.05
-                    stop_loss = sum(stop_losses) / len(stop_losses) if stop_losses else current_price * 0.97
-                    
-                    # Create ensemble signal
-                    signal_data = {
-                        'instrument_id': instrument.id,
-                        'signal_type': SignalType.LONG_CALL,
-                        'signal_source': SignalSource.ENSEMBLE,
-                        'status': SignalStatus.PENDING,
-                        'entry_price': None,  # Will be set when executed
-                        'target_price': target_price,
-                        'stop_loss': stop_loss,
-                        'confidence_score': avg_confidence,
-                        'time_frame': '7d',
-                        'option_id': atm_call.id,
-                        'option_strike': atm_call.strike_price,
-                        'option_expiration': atm_call.expiration_date,
-                        'parameters': {
-                            'indicator': 'ensemble',
-                            'strategies': [name for name, _ in call_signals],
-                            'strategy_count': len(call_signals),
-                            'avg_confidence': avg_confidence
-                        },
-                        'notes': f"Ensemble bullish signal for {instrument.symbol}. {len(call_signals)} strategies with avg confidence {avg_confidence:.2f}"
-                    }
-                    
-                    # Save signal
-                    signal = self.save_signal(signal_data)
-                    if signal:
-                        # Save signal factors
-                        for i, (strategy_name, strategy_signal) in enumerate(call_signals):
-                            # Add strategy factor
-                            self.save_signal_factor(signal.id, {
-                                'factor_name': f"strategy_{strategy_name}",
-                                'factor_value': strategy_signal.confidence_score,
-                                'factor_weight': 1.0 / len(call_signals),
-                                'factor_category': 'ensemble',
-                                'factor_description': f"Strategy: {strategy_name}, Confidence: {strategy_signal.confidence_score:.2f}"
-                            })
-                            
-                            # Add strategy source factor
-                            self.save_signal_factor(signal.id, {
-                                'factor_name': f"source_{strategy_signal.signal_source.value}",
-                                'factor_value': 1.0,
-                                'factor_weight': 0.0,  # Informational only
-                                'factor_category': 'ensemble',
-                                'factor_description': f"Signal source: {strategy_signal.signal_source.value}"
-                            })
-                        
-                        all_signals.append(signal)
+            # Collect signals from all strategies, grouped by type
+            buckets = await self.collect_strategy_signals_async(instrument, now)
+            return await asyncio.to_thread(self._combine_signals, instrument, current_price, buckets, now)
+        except Exception as e:
+            logger.error(f"Error generating {self.indicator.replace('_', ' ')} signals for {instrument.symbol}: {e}")
+            return []
+    
+    def _combine_signals(
+        self,
+        instrument: Instrument,
+        current_price: float,
+        buckets: Dict[SignalType, List[Tuple[str, Signal]]],
+        now: Optional[datetime] = None
+    ) -> List[Signal]:
+        """
+        Score the bucketed component signals and save the qualifying ensemble signals.
+        """
+        all_signals = []
+        today = (now or datetime.utcnow()).date()
+        
+        signals_by_side = {
+            'call': buckets[SignalType.LONG_CALL],
+            'put': buckets[SignalType.LONG_PUT]
+        }
+        
+        # Score the sides with enough component signals. An average can never
+        # exceed its best component, so skip sides whose best signal is too weak.
+        confidence_by_side = {}
+        for side, signals in signals_by_side.items():
+            if len(signals) < self.min_strategies:
+                continue
+            if max(s.confidence_score for _, s in signals) < self.min_confidence:
+                continue
             
-            # Generate ensemble signals for puts
-            if len(put_signals) >= self.min_strategies:
-                # Calculate average confidence
-                avg_confidence = sum(s.confidence_score for _, s in put_signals) / len(put_signals)
-                
-                if avg_confidence >= self.min_confidence:
-                    # Find ATM put option
-                    atm_put = self.find_atm_options(instrument.id, current_price, 'put')
-                    if not atm_put:
-                        return all_signals
-                    
-                    # Calculate target price and stop loss
-                    target_prices = [s.target_price for _, s in put_signals if s.target_price is not None]
-                    stop_losses = [s.stop_loss for _, s in put_signals if s.stop_loss is not None]
-                    
-                    target_price = sum(target_prices) / len(target_prices) if target_prices else current_price * 0.95
-                    stop_loss = sum(stop_losses) / len(stop_losses) if stop_losses else current_price * 1.03
-                    
-                    # Create ensemble signal
-                    signal_data = {
-                        'instrument_id': instrument.id,
-                        'signal_type': SignalType.LONG_PUT,
-                        'signal_source': SignalSource.ENSEMBLE,
-                        'status': SignalStatus.PENDING,
-                        'entry_price': None,  # Will be set when executed
-                        'target_price': target_price,
-                        'stop_loss': stop_loss,
-                        'confidence_score': avg_confidence,
-                        'time_frame': '7d',
-                        'option_id': atm_put.id,
-                        'option_strike': atm_put.strike_price,
-                        'option_expiration': atm_put.expiration_date,
-                        'parameters': {
-                            'indicator': 'ensemble',
-                            'strategies': [name for name, _ in put_signals],
-                            'strategy_count': len(put_signals),
-                            'avg_confidence': avg_confidence
-                        },
-                        'notes': f"Ensemble bearish signal for {instrument.symbol}. {len(put_signals)} strategies with avg confidence {avg_confidence:.2f}"
-                    }
-                    
-                    # Save signal
-                    signal = self.save_signal(signal_data)
-                    if signal:
-                        # Save signal factors
-                        for i, (strategy_name, strategy_signal) in enumerate(put_signals):
-                            # Add strategy factor
-                            self.save_signal_factor(signal.id, {
-                                'factor_name': f"strategy_{strategy_name}",
-                                'factor_value': strategy_signal.confidence_score,
-                                'factor_weight': 1.0 / len(put_signals),
-                                'factor_category': 'ensemble',
-                                'factor_description': f"Strategy: {strategy_name}, Confidence: {strategy_signal.confidence_score:.2f}"
-                            })
-                            
-                            # Add strategy source factor
-                            self.save_signal_factor(signal.id, {
-                                'factor_name': f"source_{strategy_signal.signal_source.value}",
-                                'factor_value': 1.0,
-                                'factor_weight': 0.0,  # Informational only
-                                'factor_category': 'ensemble',
-                                'factor_description': f"Signal source: {strategy_signal.signal_source.value}"
-                            })
-                        
-                        all_signals.append(signal)
+            confidence, factor_weights = self._ensemble_confidence(signals)
+            if confidence >= self.min_confidence:
+                confidence_by_side[side] = (confidence, factor_weights)
         
-        except Exception as e:
-            logger.error(f"Error generating ensemble signals for {instrument.symbol}: {e}")
+        if not confidence_by_side:
+            return all_signals
+        
+        # Find ATM call and put options with one query
+        atm_options = self.find_atm_options_both(
+            instrument.id, current_price, today=today, instrument=instrument
+        )
+        
+        # Generate ensemble signals for calls, then puts
+        for side, (confidence, factor_weights) in confidence_by_side.items():
+            signal = self._emit_ensemble_signal(
+                instrument, signals_by_side[side], side, current_price, confidence, factor_weights, atm_options[side]
+            )
+            if signal:
+                all_signals.append(signal)
         
         return all_signals
 
@@ -290,8 +623,23 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
     Weighted ensemble strategy that assigns different weights to different strategies.
     """
     
-    def __init__(self, db: Session, min_confidence: float = 0.6, min_strategies: int = 2):
-        super().__init__(db, min_confidence, min_strategies)
+    indicator = 'weighted_ensemble'
+    confidence_key = 'weighted_confidence'
+    notes_template = "Weighted ensemble {direction} signal for {symbol}. {count} strategies with weighted confidence {confidence:.2f}"
+    
+    def __init__(
+        self,
+        db: Session,
+        min_confidence: float = 0.6,
+        min_strategies: int = 2,
+        store_factor_descriptions: bool = False,
+        signal_cache: Optional[SignalCache] = None,
+        session_factory: Optional[sessionmaker] = None,
+        executor: Optional[Executor] = None
+    ):
+        super().__init__(
+            db, min_confidence, min_strategies, store_factor_descriptions, signal_cache, session_factory, executor
+        )
         
         # Define strategy weights
         self.strategy_weights = {
@@ -320,223 +668,48 @@ class WeightedEnsembleStrategy(EnsembleStrategy):
             SignalSource.MOMENTUM: 0.7,
             SignalSource.ENSEMBLE: 0.0  # Not used for input
         }
+        
+        # Precompute (combined, strategy, source) weights for every (strategy, source) pair
+        self._weight_table = {}
+        for strategy_name in self.strategies:
+            strategy_weight = self.strategy_weights.get(strategy_name, 0.5)
+            for source in SignalSource:
+                source_weight = self.source_weights.get(source, 0.5)
+                self._weight_table[(strategy_name, source)] = (
+                    (strategy_weight + source_weight) / 2.0, strategy_weight, source_weight
+                )
     
-    def calculate_weighted_confidence(self, signals: List[Tuple[str, Signal]]) -> float:
+    def _signal_weights(self, signals: List[Tuple[str, Signal]]) -> List[Tuple[float, float, float]]:
         """
-        Calculate weighted confidence score for a list of signals.
+        Get the (combined, strategy, source) weights of each signal, in input order.
+        """
+        return [
+            self._weight_table.get((strategy_name, signal.signal_source), (0.5, 0.5, 0.5))
+            for strategy_name, signal in signals
+        ]
+    
+    def _weighted_confidence(self, signals: List[Tuple[str, Signal]], signal_weights: List[Tuple[float, float, float]]) -> float:
+        """
+        Weighted average confidence of the signals given their per-signal weights.
         """
         if not signals:
             return 0.0
         
-        total_weight = 0.0
-        weighted_sum = 0.0
-        
-        for strategy_name, signal in signals:
-            # Get strategy weight
-            strategy_weight = self.strategy_weights.get(strategy_name, 0.5)
-            
-            # Get source weight
-            source_weight = self.source_weights.get(signal.signal_source, 0.5)
-            
-            # Calculate combined weight
-            combined_weight = (strategy_weight + source_weight) / 2.0
-            
-            # Add to weighted sum
-            weighted_sum += signal.confidence_score * combined_weight
-            total_weight += combined_weight
-        
-        # Calculate weighted average
-        if total_weight > 0:
-            return weighted_sum / total_weight
-        else:
-            return 0.0
+        weights = np.fromiter((combined for combined, _, _ in signal_weights), dtype=np.float64, count=len(signals))
+        return _weighted_mean(self._confidences(signals), weights)
     
-    def generate_signals(self, instrument: Instrument) -> List[Signal]:
+    def calculate_weighted_confidence(self, signals: List[Tuple[str, Signal]]) -> float:
         """
-        Generate signals using a weighted ensemble of strategies.
+        Calculate weighted confidence score for a list of signals.
         """
-        all_signals = []
-        
-        try:
-            # Get current price
-            current_price = instrument.last_price
-            if not current_price:
-                return all_signals
-            
-            # Collect signals from all strategies
-            strategy_signals = {}
-            
-            for name, strategy in self.strategies.items():
-                try:
-                    signals = strategy.generate_signals(instrument)
-                    if signals:
-                        strategy_signals[name] = signals
-                except Exception as e:
-                    logger.error(f"Error generating signals for strategy {name}: {e}")
-            
-            # Group signals by type
-            call_signals = []
-            put_signals = []
-            
-            for strategy_name, signals in strategy_signals.items():
-                for signal in signals:
-                    if signal.signal_type == SignalType.LONG_CALL:
-                        call_signals.append((strategy_name, signal))
-                    elif signal.signal_type == SignalType.LONG_PUT:
-                        put_signals.append((strategy_name, signal))
-            
-            # Generate ensemble signals for calls
-            if len(call_signals) >= self.min_strategies:
-                # Calculate weighted confidence
-                weighted_confidence = self.calculate_weighted_confidence(call_signals)
-                
-                if weighted_confidence >= self.min_confidence:
-                    # Find ATM call option
-                    atm_call = self.find_atm_options(instrument.id, current_price, 'call')
-                    if not atm_call:
-                        return all_signals
-                    
-                    # Calculate target price and stop loss
-                    target_prices = [s.target_price for _, s in call_signals if s.target_price is not None]
-                    stop_losses = [s.stop_loss for _, s in call_signals if s.stop_loss is not None]
-                    
-                    target_price = sum(target_prices) / len(target_prices) if target_prices else current_price * 1.05
-                    stop_loss = sum(stop_losses) / len(stop_losses) if stop_losses else current_price * 0.97
-                    
-                    # Create ensemble signal
-                    signal_data = {
-                        'instrument_id': instrument.id,
-                        'signal_type': SignalType.LONG_CALL,
-                        'signal_source': SignalSource.ENSEMBLE,
-                        'status': SignalStatus.PENDING,
-                        'entry_price': None,  # Will be set when executed
-                        'target_price': target_price,
-                        'stop_loss': stop_loss,
-                        'confidence_score': weighted_confidence,
-                        'time_frame': '7d',
-                        'option_id': atm_call.id,
-                        'option_strike': atm_call.strike_price,
-                        'option_expiration': atm_call.expiration_date,
-                        'parameters': {
-                            'indicator': 'weighted_ensemble',
-                            'strategies': [name for name, _ in call_signals],
-                            'strategy_count': len(call_signals),
-                            'weighted_confidence': weighted_confidence
-                        },
-                        'notes': f"Weighted ensemble bullish signal for {instrument.symbol}. {len(call_signals)} strategies with weighted confidence {weighted_confidence:.2f}"
-                    }
-                    
-                    # Save signal
-                    signal = self.save_signal(signal_data)
-                    if signal:
-                        # Save signal factors
-                        for i, (strategy_name, strategy_signal) in enumerate(call_signals):
-                            # Get strategy weight
-                            strategy_weight = self.strategy_weights.get(strategy_name, 0.5)
-                            
-                            # Get source weight
-                            source_weight = self.source_weights.get(strategy_signal.signal_source, 0.5)
-                            
-                            # Calculate combined weight
-                            combined_weight = (strategy_weight + source_weight) / 2.0
-                            
-                            # Add strategy factor
-                            self.save_signal_factor(signal.id, {
-                                'factor_name': f"strategy_{strategy_name}",
-                                'factor_value': strategy_signal.confidence_score,
-                                'factor_weight': combined_weight,
-                                'factor_category': 'ensemble',
-                                'factor_description': f"Strategy: {strategy_name}, Confidence: {strategy_signal.confidence_score:.2f}, Weight: {combined_weight:.2f}"
-                            })
-                            
-                            # Add strategy source factor
-                            self.save_signal_factor(signal.id, {
-                                'factor_name': f"source_{strategy_signal.signal_source.value}",
-                                'factor_value': source_weight,
-                                'factor_weight': 0.0,  # Informational only
-                                'factor_category': 'ensemble',
-                                'factor_description': f"Signal source: {strategy_signal.signal_source.value}, Weight: {source_weight:.2f}"
-                            })
-                        
-                        all_signals.append(signal)
-            
-            # Generate ensemble signals for puts
-            if len(put_signals) >= self.min_strategies:
-                # Calculate weighted confidence
-                weighted_confidence = self.calculate_weighted_confidence(put_signals)
-                
-                if weighted_confidence >= self.min_confidence:
-                    # Find ATM put option
-                    atm_put = self.find_atm_options(instrument.id, current_price, 'put')
-                    if not atm_put:
-                        return all_signals
-                    
-                    # Calculate target price and stop loss
-                    target_prices = [s.target_price for _, s in put_signals if s.target_price is not None]
-                    stop_losses = [s.stop_loss for _, s in put_signals if s.stop_loss is not None]
-                    
-                    target_price = sum(target_prices) / len(target_prices) if target_prices else current_price * 0.95
-                    stop_loss = sum(stop_losses) / len(stop_losses) if stop_losses else current_price * 1.03
-                    
-                    # Create ensemble signal
-                    signal_data = {
-                        'instrument_id': instrument.id,
-                        'signal_type': SignalType.LONG_PUT,
-                        'signal_source': SignalSource.ENSEMBLE,
-                        'status': SignalStatus.PENDING,
-                        'entry_price': None,  # Will be set when executed
-                        'target_price': target_price,
-                        'stop_loss': stop_loss,
-                        'confidence_score': weighted_confidence,
-                        'time_frame': '7d',
-                        'option_id': atm_put.id,
-                        'option_strike': atm_put.strike_price,
-                        'option_expiration': atm_put.expiration_date,
-                        'parameters': {
-                            'indicator': 'weighted_ensemble',
-                            'strategies': [name for name, _ in put_signals],
-                            'strategy_count': len(put_signals),
-                            'weighted_confidence': weighted_confidence
-                        },
-                        'notes': f"Weighted ensemble bearish signal for {instrument.symbol}. {len(put_signals)} strategies with weighted confidence {weighted_confidence:.2f}"
-                    }
-                    
-                    # Save signal
-                    signal = self.save_signal(signal_data)
-                    if signal:
-                        # Save signal factors
-                        for i, (strategy_name, strategy_signal) in enumerate(put_signals):
-                            # Get strategy weight
-                            strategy_weight = self.strategy_weights.get(strategy_name, 0.5)
-                            
-                            # Get source weight
-                            source_weight = self.source_weights.get(strategy_signal.signal_source, 0.5)
-                            
-                            # Calculate combined weight
-                            combined_weight = (strategy_weight + source_weight) / 2.0
-                            
-                            # Add strategy factor
-                            self.save_signal_factor(signal.id, {
-                                'factor_name': f"strategy_{strategy_name}",
-                                'factor_value': strategy_signal.confidence_score,
-                                'factor_weight': combined_weight,
-                                'factor_category': 'ensemble',
-                                'factor_description': f"Strategy: {strategy_name}, Confidence: {strategy_signal.confidence_score:.2f}, Weight: {combined_weight:.2f}"
-                            })
-                            
-                            # Add strategy source factor
-                            self.save_signal_factor(signal.id, {
-                                'factor_name': f"source_{strategy_signal.signal_source.value}",
-                                'factor_value': source_weight,
-                                'factor_weight': 0.0,  # Informational only
-                                'factor_category': 'ensemble',
-                                'factor_description': f"Signal source: {strategy_signal.signal_source.value}, Weight: {source_weight:.2f}"
-                            })
-                        
-                        all_signals.append(signal)
-        
-        except Exception as e:
-            logger.error(f"Error generating weighted ensemble signals for {instrument.symbol}: {e}")
-        
-        return all_signals
-
+        return self._weighted_confidence(signals, self._signal_weights(signals))
+    
+    def _ensemble_confidence(self, signals: List[Tuple[str, Signal]]) -> Tuple[float, List[Tuple[float, float]]]:
+        """
+        Calculate the ensemble confidence as the weighted component confidence,
+        with the combined and source weight of each signal for its factor and parameters.
+        """
+        # Look the weights up once for both the confidence and the factors
+        signal_weights = self._signal_weights(signals)
+        confidence = self._weighted_confidence(signals, signal_weights)
+        return confidence, [(combined, source) for combined, _, source in signal_weights]
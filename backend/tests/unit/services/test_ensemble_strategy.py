@@ -0,0 +1,284 @@
+"""
+Unit Tests for Ensemble Strategies
+
+Tests how the ensemble strategies wire their sub-strategies to database
+sessions and run them.
+"""
+
+import asyncio
+import pytest
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+
+from app.models.market_data import Base, Instrument, InstrumentType, StockPrice
+from app.models.signal import Signal, SignalSource, SignalType
+from app.services.signal_strategies import ensemble_strategy
+from app.services.signal_strategies.ensemble_strategy import EnsembleStrategy, SignalCache, WeightedEnsembleStrategy
+
+
+@pytest.fixture
+def engine(tmp_path):
+    """File-backed SQLite engine, so separate sessions use separate connections."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'ensemble.db'}")
+    Base.metadata.create_all(engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db(engine):
+    session = Session(engine)
+    yield session
+    session.rollback()
+    session.close()
+
+
+class StubStrategy:
+    """Sub-strategy stand-in that counts its runs and returns fixed signals."""
+
+    def __init__(self, *signals, error=None, release=None):
+        self.signals = list(signals)
+        self.error = error
+        self.release = release
+        self.runs = 0
+        self._lock = threading.Lock()
+
+    def generate_signals(self, instrument):
+        with self._lock:
+            self.runs += 1
+        if self.release is not None:
+            self.release.wait(5)
+        if self.error is not None:
+            raise self.error
+        return self.signals
+
+
+def _use_strategies(ensemble, strategies):
+    """Replace the ensemble's sub-strategies with stubs."""
+    ensemble.strategies = strategies
+    ensemble._strategy_items = tuple(strategies.items())
+    return ensemble
+
+
+@pytest.fixture
+def instrument():
+    return Instrument(id=1, symbol="AAPL", name="Apple Inc.", type=InstrumentType.STOCK)
+
+
+@pytest.fixture
+def executor():
+    executor = ThreadPoolExecutor(max_workers=1)
+    yield executor
+    executor.shutdown(wait=True)
+
+
+class TestSubStrategySessions:
+    """Test which session the sub-strategies run on."""
+
+    @pytest.mark.unit
+    def test_sub_strategies_share_the_injected_session(self, db):
+        """Test sub-strategies see rows the caller has not committed."""
+        instrument = Instrument(symbol="AAPL", name="Apple Inc.", type=InstrumentType.STOCK)
+        db.add(instrument)
+        db.flush()
+        db.add_all([
+            StockPrice(instrument_id=instrument.id, timestamp=datetime.utcnow() - timedelta(days=day), close=180.0 + day)
+            for day in range(1, 6)
+        ])
+        db.flush()
+
+        ensemble = EnsembleStrategy(db)
+
+        assert all(strategy.db is db for strategy in ensemble.strategies.values())
+        for name in ('rsi', 'macd', 'bollinger', 'momentum'):
+            prices = ensemble.strategies[name].get_historical_prices(instrument.id)
+            assert len(prices) == 5, name
+
+    @pytest.mark.unit
+    def test_session_factory_gives_sub_strategies_thread_local_sessions(self, db, engine):
+        """Test an explicit session factory replaces the injected session for sub-strategies."""
+        factory = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            ensemble = EnsembleStrategy(db, session_factory=factory, executor=executor)
+
+        assert all(isinstance(strategy.db, scoped_session) for strategy in ensemble.strategies.values())
+        assert all(strategy.db is not db for strategy in ensemble.strategies.values())
+
+    @pytest.mark.unit
+    def test_session_factory_and_executor_go_together(self, db, engine):
+        """Test pooled runs need both a session factory and a caller-owned executor."""
+        with pytest.raises(ValueError):
+            EnsembleStrategy(db, session_factory=sessionmaker(bind=engine))
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            with pytest.raises(ValueError):
+                EnsembleStrategy(db, executor=executor)
+
+
+class TestSignalCache:
+    """Test sharing sub-strategy runs between ensembles in one tick."""
+
+    @pytest.mark.unit
+    def test_starts_one_run_per_strategy_and_instrument(self, instrument):
+        """Test repeated submits in a tick reuse the first future."""
+        cache = SignalCache()
+        tick = datetime(2024, 1, 2, 10, 0)
+        started = []
+
+        def start():
+            started.append(1)
+            return ensemble_strategy._run_inline(StubStrategy(), instrument)
+
+        first = cache.submit('rsi', instrument, tick, start)
+        second = cache.submit('rsi', instrument, tick, start)
+        other = cache.submit('macd', instrument, tick, start)
+
+        assert first is second
+        assert other is not first
+        assert len(started) == 2
+
+    @pytest.mark.unit
+    def test_new_tick_drops_previous_results(self, instrument):
+        """Test a new tick starts fresh runs."""
+        cache = SignalCache()
+        start = lambda: ensemble_strategy._run_inline(StubStrategy(), instrument)
+        tick = datetime(2024, 1, 2, 10, 0)
+
+        first = cache.submit('rsi', instrument, tick, start)
+        second = cache.submit('rsi', instrument, tick + timedelta(minutes=1), start)
+
+        assert first is not second
+
+    @pytest.mark.unit
+    def test_ensembles_sharing_a_cache_run_each_strategy_once(self, db, instrument):
+        """Test two ensembles in one tick run each sub-strategy once and see the same signals."""
+        cache = SignalCache()
+        signal = Signal(signal_type=SignalType.LONG_CALL, confidence_score=0.7)
+        rsi, macd = StubStrategy(signal), StubStrategy()
+        tick = datetime(2024, 1, 2, 10, 0)
+
+        first = _use_strategies(EnsembleStrategy(db, signal_cache=cache), {'rsi': rsi, 'macd': macd})
+        second = _use_strategies(EnsembleStrategy(db, signal_cache=cache), {'rsi': rsi, 'macd': macd})
+
+        assert first.collect_strategy_signals(instrument, now=tick) == {SignalType.LONG_CALL: [('rsi', signal)]}
+        assert second.collect_strategy_signals(instrument, now=tick) == {SignalType.LONG_CALL: [('rsi', signal)]}
+        assert (rsi.runs, macd.runs) == (1, 1)
+
+    @pytest.mark.unit
+    def test_waiter_timeout_does_not_cancel_shared_run(self, db, engine, instrument, executor, monkeypatch):
+        """Test an ensemble timing out on a shared run leaves it running for the others."""
+        monkeypatch.setattr(ensemble_strategy, 'STRATEGY_TIMEOUT', 0.05)
+        cache = SignalCache()
+        release = threading.Event()
+        signal = Signal(signal_type=SignalType.LONG_PUT, confidence_score=0.8)
+        slow = StubStrategy(signal)
+        # Keep the only worker busy so the shared run is still queued, and cancellable, at the timeout
+        executor.submit(release.wait, 5)
+        factory = sessionmaker(bind=engine, expire_on_commit=False)
+        tick = datetime(2024, 1, 2, 10, 0)
+
+        first = _use_strategies(
+            EnsembleStrategy(db, signal_cache=cache, session_factory=factory, executor=executor), {'slow': slow}
+        )
+        assert asyncio.run(first.collect_strategy_signals_async(instrument, now=tick)) == {}
+
+        future = cache.submit('slow', instrument, tick, lambda: pytest.fail("shared run was restarted"))
+        assert not future.cancelled()
+
+        release.set()
+        second = _use_strategies(
+            EnsembleStrategy(db, signal_cache=cache, session_factory=factory, executor=executor), {'slow': slow}
+        )
+        assert second.collect_strategy_signals(instrument, now=tick) == {SignalType.LONG_PUT: [('slow', signal)]}
+        assert slow.runs == 1
+
+
+class TestCollectStrategySignalsAsync:
+    """Test gathering sub-strategy signals from the event loop."""
+
+    @pytest.mark.unit
+    def test_buckets_signals_by_type(self, db, instrument):
+        """Test signals are bucketed by type with the name of the strategy that produced them."""
+        call = Signal(signal_type=SignalType.LONG_CALL, confidence_score=0.7)
+        put = Signal(signal_type=SignalType.LONG_PUT, confidence_score=0.6)
+        ensemble = _use_strategies(EnsembleStrategy(db), {
+            'rsi': StubStrategy(call), 'macd': StubStrategy(put), 'momentum': StubStrategy()
+        })
+
+        buckets = asyncio.run(ensemble.collect_strategy_signals_async(instrument))
+
+        assert buckets == {SignalType.LONG_CALL: [('rsi', call)], SignalType.LONG_PUT: [('macd', put)]}
+
+    @pytest.mark.unit
+    def test_failing_strategy_is_logged_and_skipped(self, db, instrument, caplog):
+        """Test an exception from one strategy is kept out of the buckets."""
+        call = Signal(signal_type=SignalType.LONG_CALL, confidence_score=0.7)
+        ensemble = _use_strategies(EnsembleStrategy(db), {
+            'rsi': StubStrategy(call), 'macd': StubStrategy(error=RuntimeError("no prices"))
+        })
+
+        buckets = asyncio.run(ensemble.collect_strategy_signals_async(instrument))
+
+        assert buckets == {SignalType.LONG_CALL: [('rsi', call)]}
+        assert "strategy macd" in caplog.text
+        assert "no prices" in caplog.text
+
+    @pytest.mark.unit
+    def test_timed_out_strategy_is_logged_and_skipped(self, db, engine, instrument, monkeypatch, caplog):
+        """Test a strategy still running at the timeout is skipped while the others are kept."""
+        monkeypatch.setattr(ensemble_strategy, 'STRATEGY_TIMEOUT', 0.05)
+        release = threading.Event()
+        call = Signal(signal_type=SignalType.LONG_CALL, confidence_score=0.7)
+        factory = sessionmaker(bind=engine, expire_on_commit=False)
+
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            ensemble = _use_strategies(EnsembleStrategy(db, session_factory=factory, executor=executor), {
+                'rsi': StubStrategy(call), 'slow': StubStrategy(release=release)
+            })
+            try:
+                buckets = asyncio.run(ensemble.collect_strategy_signals_async(instrument))
+            finally:
+                release.set()
+
+        assert buckets == {SignalType.LONG_CALL: [('rsi', call)]}
+        assert "strategy slow" in caplog.text
+        assert "TimeoutError" in caplog.text
+
+    @pytest.mark.unit
+    def test_runs_each_strategy_once_per_tick(self, db, instrument):
+        """Test ensembles sharing a cache run each strategy once per instrument in a tick."""
+        cache = SignalCache()
+        rsi = StubStrategy(Signal(signal_type=SignalType.LONG_CALL, confidence_score=0.7))
+        other = Instrument(id=2, symbol="MSFT", name="Microsoft Corporation", type=InstrumentType.STOCK)
+        tick = datetime(2024, 1, 2, 10, 0)
+
+        for _ in range(2):
+            ensemble = _use_strategies(EnsembleStrategy(db, signal_cache=cache), {'rsi': rsi})
+            asyncio.run(ensemble.collect_strategy_signals_async(instrument, now=tick))
+            asyncio.run(ensemble.collect_strategy_signals_async(other, now=tick))
+
+        assert rsi.runs == 2
+
+
+class TestWeightedConfidence:
+    """Test the weighted ensemble confidence."""
+
+    @pytest.mark.unit
+    def test_calculate_weighted_confidence_returns_a_float(self, db):
+        """Test the public helper returns the weighted average confidence only."""
+        ensemble = WeightedEnsembleStrategy(db)
+        signals = [
+            ('earnings', Signal(signal_source=SignalSource.FUNDAMENTAL, confidence_score=0.9)),
+            ('rsi', Signal(signal_source=SignalSource.TECHNICAL, confidence_score=0.6))
+        ]
+
+        confidence = ensemble.calculate_weighted_confidence(signals)
+
+        assert isinstance(confidence, float)
+        assert confidence == pytest.approx((0.9 * 0.9 + 0.6 * 0.7) / (0.9 + 0.7))
+        assert ensemble.calculate_weighted_confidence([]) == 0.0
+        assert ensemble._ensemble_confidence(signals) == (pytest.approx(confidence), [(0.9, 0.9), (0.7, 0.7)])
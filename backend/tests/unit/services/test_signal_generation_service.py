@@ -0,0 +1,231 @@
+"""
+Unit Tests for Signal Generation Service
+
+Tests signal and signal factor persistence on non-PostgreSQL binds, where
+factors are written with a plain INSERT instead of COPY, and the per-instrument
+TTL cache on the generate_*_signals methods, and the sessions generators open
+for off-thread work.
+"""
+
+import asyncio
+import pytest
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from app.models.market_data import Base, Instrument, InstrumentType, Option
+from app.models.signal import Signal, SignalFactor, SignalSource, SignalStatus, SignalType
+from app.services import signal_generation_service
+from app.services.signal_generation_service import EnsembleSignalGenerator, SignalGenerator, ttl_cache
+
+
+@pytest.fixture
+def sqlite_session():
+    """In-memory SQLite session with the signal tables created."""
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+
+    session = Session(engine)
+    session.add(Instrument(id=1, symbol="AAPL", name="Apple Inc.", type=InstrumentType.STOCK))
+    session.commit()
+
+    yield session
+
+    session.close()
+    engine.dispose()
+
+
+def _signal_data():
+    return {
+        'instrument_id': 1,
+        'signal_type': SignalType.LONG_CALL,
+        'signal_source': SignalSource.TECHNICAL,
+        'status': SignalStatus.PENDING,
+        'confidence_score': 0.75,
+        'time_frame': '7d'
+    }
+
+
+def _factor(name, description):
+    return {
+        'factor_name': name,
+        'factor_value': 0.5,
+        'factor_weight': 0.25,
+        'factor_category': 'technical',
+        'factor_description': description
+    }
+
+
+class TestSignalFactorPersistence:
+    """Test factor writes without psycopg2 COPY."""
+
+    @pytest.mark.unit
+    def test_save_signal_writes_factors_with_insert_fallback(self, sqlite_session):
+        """Test save_signal commits the signal and its factors on a SQLite bind."""
+        generator = SignalGenerator(sqlite_session)
+
+        signal = generator.save_signal(_signal_data(), [_factor('rsi', 'RSI(14) value: 28.00'), _factor('volume', None)])
+
+        assert signal is not None
+        factors = {
+            factor.factor_name: factor
+            for factor in sqlite_session.query(SignalFactor).filter(SignalFactor.signal_id == signal.id)
+        }
+        assert set(factors) == {'rsi', 'volume'}
+        assert factors['rsi'].factor_description == 'RSI(14) value: 28.00'
+        assert factors['volume'].factor_description is None
+        assert factors['rsi'].created_at is not None
+
+    @pytest.mark.unit
+    def test_save_signal_factors_keeps_empty_descriptions(self, sqlite_session):
+        """Test save_signal_factors writes immediately and keeps empty strings distinct from NULL."""
+        generator = SignalGenerator(sqlite_session)
+        signal_ids = generator.save_signals([(_signal_data(), [])])
+
+        assert generator.save_signal_factors(signal_ids[0], [_factor('empty', ''), _factor('missing', None)])
+
+        descriptions = dict(
+            sqlite_session.query(SignalFactor.factor_name, SignalFactor.factor_description).filter(
+                SignalFactor.signal_id == signal_ids[0]
+            ).all()
+        )
+        assert descriptions == {'empty': '', 'missing': None}
+        assert sqlite_session.query(Signal).count() == 1
+
+
+class TestSessionFactory:
+    """Test generators open their extra sessions from the injected factory."""
+
+    @pytest.mark.unit
+    def test_option_load_uses_the_session_factory(self, sqlite_session):
+        """Test the 7 DTE option load reads through sessions from the factory."""
+        now = datetime(2024, 1, 2, 10, 0)
+        sqlite_session.add(Option(
+            instrument_id=1, symbol="AAPL240109C00185000", expiration_date=now + timedelta(days=7),
+            strike_price=185.0, option_type='call'
+        ))
+        sqlite_session.commit()
+        opened = []
+
+        def factory():
+            session = Session(sqlite_session.get_bind())
+            opened.append(session)
+            return session
+
+        generator = SignalGenerator(sqlite_session, session_factory=factory)
+        generator._refresh_clock(now)
+
+        options = generator._load_option_cache([1])
+
+        assert len(opened) == 1
+        assert [option.strike_price for option in options[(1, 'call')][0]] == [185.0]
+
+    @pytest.mark.unit
+    def test_forks_keep_the_session_factory(self, sqlite_session):
+        """Test per-symbol forks open their own sessions from the same factory."""
+        factory = sessionmaker(bind=sqlite_session.get_bind())
+        generator = SignalGenerator(sqlite_session, session_factory=factory)
+
+        assert generator._fork(sqlite_session).session_factory is factory
+
+    @pytest.mark.unit
+    def test_ensemble_runs_generators_on_the_session_factory(self, sqlite_session):
+        """Test the ensemble's individual generators get sessions and the factory from the ensemble."""
+        factory = sessionmaker(bind=sqlite_session.get_bind())
+        seen = []
+
+        class RecordingGenerator(SignalGenerator):
+            async def generate_signals(self, now=None):
+                seen.append((self.db.get_bind(), self.session_factory, now))
+
+        ensemble = EnsembleSignalGenerator(sqlite_session, session_factory=factory)
+
+        ensemble._run_generator(RecordingGenerator)
+
+        assert seen == [(sqlite_session.get_bind(), factory, ensemble._now)]
+
+
+    @pytest.mark.unit
+    def test_gather_symbols_runs_the_callable_on_forks(self, sqlite_session):
+        """Test each symbol runs the given callable on a fork bound to its own session."""
+        factory = sessionmaker(bind=sqlite_session.get_bind())
+        generator = SignalGenerator(sqlite_session, session_factory=factory)
+        seen = []
+
+        async def generate(fork, symbol):
+            seen.append((symbol, type(fork), fork is not generator, fork.db is not sqlite_session))
+
+        asyncio.run(generator._gather_symbols(["AAPL", "MSFT"], generate))
+
+        assert sorted(seen) == [("AAPL", SignalGenerator, True, True), ("MSFT", SignalGenerator, True, True)]
+
+
+class TestTtlCache:
+    """Test skipping repeat generate_*_signals runs."""
+
+    @pytest.fixture
+    def clock(self, monkeypatch):
+        clock = SimpleNamespace(now=1000.0)
+        monkeypatch.setattr(signal_generation_service, 'time', SimpleNamespace(monotonic=lambda: clock.now))
+        return clock
+
+    @staticmethod
+    def _generator(marker):
+        class Generator:
+            runs = 0
+            checks = 0
+
+            def freshness(self, instrument):
+                Generator.checks += 1
+                return marker['value']
+
+            @ttl_cache(seconds=60, freshness=freshness, freshness_interval=10)
+            async def generate(self, instrument):
+                Generator.runs += 1
+
+        return Generator
+
+    @pytest.mark.unit
+    def test_cache_hits_skip_freshness_until_the_interval(self, clock):
+        """Test hits inside the TTL do not query freshness more than once per interval."""
+        marker = {'value': date(2024, 1, 1)}
+        Generator = self._generator(marker)
+        generator, instrument = Generator(), SimpleNamespace(id=1)
+
+        asyncio.run(generator.generate(instrument))
+        for _ in range(5):
+            clock.now += 1
+            asyncio.run(generator.generate(instrument))
+
+        assert (Generator.runs, Generator.checks) == (1, 1)
+
+        clock.now += 10
+        asyncio.run(generator.generate(instrument))
+        assert (Generator.runs, Generator.checks) == (1, 2)
+
+    @pytest.mark.unit
+    def test_new_marker_inside_the_ttl_reruns(self, clock):
+        """Test a fresh ingest is picked up at the next freshness check."""
+        marker = {'value': date(2024, 1, 1)}
+        Generator = self._generator(marker)
+        generator, instrument = Generator(), SimpleNamespace(id=1)
+
+        asyncio.run(generator.generate(instrument))
+        marker['value'] = date(2024, 1, 2)
+        clock.now += 10
+        asyncio.run(generator.generate(instrument))
+
+        assert Generator.runs == 2
+
+    @pytest.mark.unit
+    def test_expired_entry_reruns(self, clock):
+        """Test a run after the TTL goes ahead with an unchanged marker."""
+        Generator = self._generator({'value': date(2024, 1, 1)})
+        generator, instrument = Generator(), SimpleNamespace(id=1)
+
+        asyncio.run(generator.generate(instrument))
+        clock.now += 60
+        asyncio.run(generator.generate(instrument))
+
+        assert Generator.runs == 2
@@ -0,0 +1,147 @@
+"""
+Unit Tests for Technical Indicator Kernels
+
+Tests the single-pass RSI, MACD and Bollinger Band kernels against the
+pandas formulas they replaced.
+"""
+
+import pytest
+import numpy as np
+import pandas as pd
+
+from app.services._ta_kernels import MIN_TA_BARS, bollinger_last, compute_ta_tail
+
+
+def _reference_tail(close: np.ndarray, volume: np.ndarray) -> dict:
+    """Latest indicator values computed with pandas, as in the original signal rules."""
+    closes = pd.Series(close.astype(np.float64))
+
+    # RSI(14) with Wilder's smoothing seeded by the simple average of the first 14 moves
+    deltas = closes.diff().iloc[1:]
+    gains = deltas.clip(lower=0).to_numpy()
+    losses = (-deltas).clip(lower=0).to_numpy()
+    avg_gain = pd.Series(np.r_[gains[:14].mean(), gains[14:]]).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    avg_loss = pd.Series(np.r_[losses[:14].mean(), losses[14:]]).ewm(alpha=1 / 14, adjust=False).mean().iloc[-1]
+    rsi = 100.0 if avg_loss == 0 else 100 - 100 / (1 + avg_gain / avg_loss)
+
+    # MACD(12, 26, 9)
+    macd = closes.ewm(span=12, adjust=False).mean() - closes.ewm(span=26, adjust=False).mean()
+    signal_line = macd.ewm(span=9, adjust=False).mean()
+
+    # Bollinger Bands(20, 2)
+    sma = closes.rolling(window=20).mean()
+    std = closes.rolling(window=20).std(ddof=1)
+
+    volumes = pd.Series(volume.astype(np.float64))
+
+    return {
+        'close': closes.iloc[-1],
+        'prev_close': closes.iloc[-2],
+        'rsi': rsi,
+        'macd': macd.iloc[-1],
+        'prev_macd': macd.iloc[-2],
+        'signal_line': signal_line.iloc[-1],
+        'prev_signal_line': signal_line.iloc[-2],
+        'histogram': macd.iloc[-1] - signal_line.iloc[-1],
+        'sma': sma.iloc[-1],
+        'upper_band': sma.iloc[-1] + 2 * std.iloc[-1],
+        'lower_band': sma.iloc[-1] - 2 * std.iloc[-1],
+        'prev_upper_band': sma.iloc[-2] + 2 * std.iloc[-2],
+        'prev_lower_band': sma.iloc[-2] - 2 * std.iloc[-2],
+        'volume_ratio': volumes.iloc[-1] / volumes.iloc[-5:].mean()
+    }
+
+
+def _price_series(bars: int, seed: int = 7):
+    rng = np.random.default_rng(seed)
+    close = 150.0 + np.cumsum(rng.normal(0.0, 2.0, bars))
+    volume = rng.integers(1_000_000, 5_000_000, bars).astype(np.float64)
+    return close, volume
+
+
+def _assert_matches_reference(close: np.ndarray, volume: np.ndarray):
+    tail = compute_ta_tail(close, volume)
+    expected = _reference_tail(close, volume)
+
+    for field, value in expected.items():
+        assert getattr(tail, field) == pytest.approx(value, rel=1e-9, abs=1e-9), field
+
+
+class TestComputeTaTail:
+    """Test the fused indicator kernel against the pandas formulas."""
+
+    @pytest.mark.unit
+    def test_matches_pandas_indicators(self):
+        """Test all indicators on a long random walk."""
+        close, volume = _price_series(250)
+        _assert_matches_reference(close, volume)
+
+    @pytest.mark.unit
+    def test_matches_pandas_indicators_for_float32_prices(self):
+        """Test float32 inputs match the pandas formulas on the same values."""
+        close, volume = _price_series(120, seed=11)
+        _assert_matches_reference(close.astype(np.float32), volume.astype(np.float32))
+
+    @pytest.mark.unit
+    def test_matches_pandas_indicators_at_minimum_bars(self):
+        """Test the shortest accepted history, exactly MIN_TA_BARS bars."""
+        close, volume = _price_series(MIN_TA_BARS, seed=3)
+        _assert_matches_reference(close, volume)
+
+    @pytest.mark.unit
+    def test_rejects_short_history(self):
+        """Test fewer than MIN_TA_BARS bars raise instead of returning unwarmed values."""
+        close, volume = _price_series(MIN_TA_BARS - 1)
+
+        with pytest.raises(ValueError):
+            compute_ta_tail(close, volume)
+
+    @pytest.mark.unit
+    def test_flat_series(self):
+        """Test a flat series: no losses gives RSI 100 and zero deviation collapses the bands."""
+        close = np.full(60, 100.0)
+        volume = np.full(60, 2_000_000.0)
+
+        tail = compute_ta_tail(close, volume)
+
+        assert tail.rsi == 100.0
+        assert tail.macd == 0.0
+        assert tail.signal_line == 0.0
+        assert tail.histogram == 0.0
+        assert tail.sma == pytest.approx(100.0)
+        assert tail.upper_band == pytest.approx(100.0)
+        assert tail.lower_band == pytest.approx(100.0)
+        assert tail.prev_upper_band == pytest.approx(100.0)
+        assert tail.prev_lower_band == pytest.approx(100.0)
+        assert tail.volume_ratio == pytest.approx(1.0)
+
+    @pytest.mark.unit
+    def test_rising_series_has_no_losses(self):
+        """Test a strictly rising series reports RSI 100 rather than dividing by zero."""
+        close = np.linspace(100.0, 130.0, MIN_TA_BARS)
+        volume = np.full(MIN_TA_BARS, 1_000_000.0)
+
+        assert compute_ta_tail(close, volume).rsi == 100.0
+
+
+class TestBollingerLast:
+    """Test the two-window Bollinger Band kernel."""
+
+    @pytest.mark.unit
+    def test_matches_pandas_rolling_bands(self):
+        """Test both windows match rolling mean and sample standard deviation."""
+        close, _ = _price_series(21, seed=5)
+        closes = pd.Series(close)
+        sma = closes.rolling(window=20).mean()
+        std = closes.rolling(window=20).std(ddof=1)
+
+        result = bollinger_last(close)
+
+        expected = (
+            sma.iloc[-1],
+            sma.iloc[-1] + 2 * std.iloc[-1],
+            sma.iloc[-1] - 2 * std.iloc[-1],
+            sma.iloc[-2] + 2 * std.iloc[-2],
+            sma.iloc[-2] - 2 * std.iloc[-2]
+        )
+        assert result == pytest.approx(expected, rel=1e-9, abs=1e-9)